@@ -0,0 +1,33 @@
+''' Generador determinista de libros de transacciones para las pruebas de rendimiento. '''
+import numpy as np
+import pandas as pd
+from gestor.storage import COLUMNS
+from gestor.transactions import DATE_FORMAT
+
+WORDS = ['pago', 'compra', 'cena', 'bus', 'taxi', 'mercado', 'luz', 'agua', 'renta', 'cine',
+         'farmacia', 'regalo', 'libro', 'cafe', 'gasolina', 'seguro', 'internet', 'telefono']
+
+
+def generate_ledger(rows: int, categories: int = 12, years: int = 5, description_length: int = 20,
+                    end_year: int = 2024, income_share: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    '''Genera un libro sintético con las columnas del gestor.
+    Con la misma semilla y parámetros siempre se obtiene el mismo libro. Las fechas se
+    reparten al azar entre el 1 de enero de end_year - years + 1 y el 31 de diciembre
+    de end_year; las descripciones son palabras al azar recortadas a description_length.
+    Retorna un DataFrame con Date como texto en el formato de los archivos de datos.'''
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(end_year - years + 1, 1, 1).value // 10**9
+    end = pd.Timestamp(end_year + 1, 1, 1).value // 10**9
+    seconds = np.sort(rng.integers(start, end, rows))
+    dates = pd.to_datetime(seconds, unit='s').strftime(DATE_FORMAT)
+    models = np.where(rng.random(rows) < income_share, 'income', 'expense')
+    amounts = np.round(rng.gamma(2.0, 40.0, rows), 2)
+    names = np.array([f'Categoria_{i:02d}' for i in range(categories)])
+    category = names[rng.integers(0, categories, rows)]
+    # Un vocabulario fijo de descripciones: se repiten como en un libro real #
+    vocabulary = []
+    for _ in range(max(1, min(rows, 5000))):
+        words = rng.choice(WORDS, size=max(1, description_length // 4))
+        vocabulary.append(' '.join(words)[:description_length])
+    description = np.array(vocabulary)[rng.integers(0, len(vocabulary), rows)]
+    return pd.DataFrame(dict(zip(COLUMNS, [models, amounts, category, description, dates])))
@@ -0,0 +1,197 @@
+''' Pruebas de rendimiento de las operaciones principales del gestor.
+
+    python -m benchmarks.run                       # 1k, 100k y 1M filas
+    python -m benchmarks.run --sizes 1000 100000 --repeat 5
+    python -m benchmarks.run --update-baseline
+
+Cada operación se mide sobre un libro sintético (benchmarks.ledger) y se guarda el
+mejor tiempo de varias repeticiones y el pico de memoria (tracemalloc). Si existe una
+línea base en JSON se compara con ella y se marcan las operaciones que empeoraron más
+de la tolerancia; si no existe, los resultados se guardan como línea base.
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.ledger import generate_ledger
+from gestor.core import FinanceManager
+from gestor.transactions import Transactions
+
+SIZES = [1_000, 100_000, 1_000_000]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Escribir y leer un xlsx de un millón de filas lleva minutos: por defecto se limita #
+EXCEL_MAX_ROWS = 100_000
+SINGLE_ADDS = 1_000
+
+
+def measure(func, repeat: int = 3, memory: bool = True) -> dict:
+    '''Mejor tiempo y mediana de repeat ejecuciones y, si memory es True, el pico de
+    memoria de una ejecución extra (tracemalloc ralentiza, por eso no se cronometra).'''
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    result = {'seconds': min(times), 'median': statistics.median(times)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def bench_size(rows: int, repeat: int = 3, memory: bool = True, excel_max_rows: int = EXCEL_MAX_ROWS,
+               **ledger_options) -> dict:
+    '''Mide todas las operaciones con un libro de rows filas. Se ejecuta dentro de una carpeta temporal.'''
+    ledger = generate_ledger(rows, **ledger_options)
+    year = int(ledger['Date'].iloc[-1][6:10])
+    os.makedirs('data', exist_ok=True)
+    ledger.to_csv(os.path.join('data', 'data_bench.csv'), index=False)
+    results = {}
+
+    def fresh() -> FinanceManager:
+        manager = FinanceManager()
+        # Se mide la lectura real, no la caché de archivos ya leídos #
+        manager.parse_cache = None
+        return manager
+
+    if rows <= excel_max_rows:
+        ledger.to_excel(os.path.join('data', 'data_bench.xlsx'), index=False)
+        results['load_excel'] = measure(lambda: fresh().load_excel(), repeat, memory)
+    else:
+        results['load_excel'] = {'skipped': f'más de {excel_max_rows} filas'}
+    results['load_csv'] = measure(lambda: fresh().load_csv(os.path.join('data', 'data_bench.csv')), repeat, memory)
+
+    manager = fresh()
+    manager.load_csv(os.path.join('data', 'data_bench.csv'))
+    manager.flush()
+
+    def single_adds():
+        for i in range(SINGLE_ADDS):
+            manager.add_transaction(Transactions('expense', 1.0 + i % 50, 'Categoria_00', 'bench',
+                                                 f'15-06-{year} 12:00:00'))
+        # Incluye unir las filas pendientes, como al leer el DataFrame después #
+        manager.flush()
+
+    results[f'add_transaction_x{SINGLE_ADDS}'] = measure(single_adds, repeat, memory)
+    results['total_balance'] = measure(manager.total_balance, repeat, memory)
+    results['monthly_expenses'] = measure(lambda: manager.monthly_expenses(year, 6), repeat, memory)
+    results['monthly_expenses_daily'] = measure(lambda: manager.monthly_expenses(year, 6, daily=True), repeat, memory)
+    results['anual_expenses'] = measure(lambda: manager.anual_expenses(year), repeat, memory)
+    results['anual_expenses_all_years'] = measure(lambda: manager.anual_expenses(all_years=True), repeat, memory)
+    results['search_transactions'] = measure(
+        lambda: manager.search_transactions(category='categoria_03', start_date=f'01-03-{year} 00:00:00',
+                                            end_date=f'31-03-{year} 23:59:59'), repeat, memory)
+    results['search_description'] = measure(lambda: manager.search_transactions(description='cena'), repeat, memory)
+
+    from gestor.visualizations import Graphs
+    graphs = Graphs(manager, headless=True, cache=False)
+    _, resumen = manager.monthly_expenses(year, 6)
+    # La primera llamada importa matplotlib: se hace antes de cronometrar #
+    graphs.expenses_graphics(resumen, 'bench')
+    results['expenses_graphics'] = measure(lambda: graphs.expenses_graphics(resumen, 'bench'), repeat, memory)
+    results['timeseries_chart'] = measure(lambda: graphs.render(*graphs.timeseries_chart()), repeat, memory)
+    return results
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.25, min_seconds: float = 0.005,
+            min_bytes: int = 1_000_000) -> list:
+    '''Operaciones que empeoraron respecto a la línea base más de la tolerancia.
+    Las diferencias menores que min_seconds o min_bytes se consideran ruido.
+    Retorna una lista de (tamaño, operación, métrica, antes, ahora).'''
+    regressions = []
+    for size, operations in current.get('results', {}).items():
+        base_operations = baseline.get('results', {}).get(size, {})
+        for name, result in operations.items():
+            base = base_operations.get(name, {})
+            for metric, floor in (('seconds', min_seconds), ('peak_bytes', min_bytes)):
+                before, now = base.get(metric), result.get(metric)
+                if before is None or now is None:
+                    continue
+                if now > before * (1 + tolerance) and now - before > floor:
+                    regressions.append((size, name, metric, before, now))
+    return regressions
+
+
+def report(current: dict, baseline: dict = None) -> str:
+    '''Tabla de resultados, con la variación respecto a la línea base si existe.'''
+    lines = [f"{'filas':>9} {'operación':<28} {'segundos':>10} {'mediana':>10} {'pico MB':>9} {'vs base':>8}"]
+    for size, operations in current['results'].items():
+        for name, result in operations.items():
+            if 'skipped' in result:
+                lines.append(f'{size:>9} {name:<28} {"omitida: " + result["skipped"]}')
+                continue
+            peak = f"{result['peak_bytes'] / 1e6:9.1f}" if 'peak_bytes' in result else f"{'-':>9}"
+            base = (baseline or {}).get('results', {}).get(size, {}).get(name, {}).get('seconds')
+            change = f'{(result["seconds"] / base - 1) * 100:+7.0f}%' if base else f"{'-':>8}"
+            lines.append(f"{size:>9} {name:<28} {result['seconds']:10.4f} {result['median']:10.4f} {peak} {change}")
+    return '\n'.join(lines)
+
+
+def main(argv: list = None) -> int:
+    '''Ejecuta las pruebas, las compara con la línea base y retorna 1 si hay regresiones.'''
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='No medir el pico de memoria.')
+    parser.add_argument('--excel-max-rows', type=int, default=EXCEL_MAX_ROWS)
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--description-length', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE, help='Archivo JSON de la línea base.')
+    parser.add_argument('--update-baseline', action='store_true', help='Reemplaza la línea base con estos resultados.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Empeoramiento permitido (0.25 = 25%%).')
+    parser.add_argument('--output', help='Guarda también los resultados en este archivo JSON.')
+    args = parser.parse_args(argv)
+
+    ledger_options = {'categories': args.categories, 'years': args.years,
+                      'description_length': args.description_length, 'seed': args.seed}
+    current = {
+        'meta': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                 'platform': platform.platform(), 'date': pd.Timestamp.now().isoformat(timespec='seconds'),
+                 'repeat': args.repeat, **ledger_options},
+        'results': {},
+    }
+    original_dir = os.getcwd()
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                current['results'][str(rows)] = bench_size(rows, args.repeat, not args.no_memory,
+                                                           args.excel_max_rows, **ledger_options)
+            finally:
+                os.chdir(original_dir)
+        print(f'{rows} filas: listo', file=sys.stderr)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(report(current, baseline))
+
+    regressions = compare(baseline, current, args.tolerance) if baseline else []
+    for size, name, metric, before, now in regressions:
+        print(f'REGRESIÓN {name} ({size} filas) {metric}: {before:.4g} -> {now:.4g}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    if baseline is None or args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f'Línea base guardada en {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import math
+import pandas as pd
+
+
+class RunningTotals:
+    ''' Totales acumulados de ingresos y gastos.
+    Se actualizan con la diferencia de cada alta, edición o baja, de modo que
+    consultar el balance no depende del tamaño del libro.
+    Atributos:
+        totals (dict): Suma de montos por tipo de transacción ('income' y 'expense').
+        rows (int): Número de transacciones contabilizadas.
+    Métodos:
+        add: Suma (sign=1) o resta (sign=-1) el monto de una transacción.
+        add_frame: Suma o resta los montos de un bloque de transacciones.
+        rebuild: Recalcula los totales desde cero.
+        balance: Ingresos menos gastos.
+        matches: Compara con otros totales tolerando errores de redondeo.
+    '''
+    MODELS = ('income', 'expense')
+
+    def __init__(self):
+        self.totals = {model: 0.0 for model in self.MODELS}
+        self.rows = 0
+
+    def add(self, model: str, amount: float, sign: int = 1) -> None:
+        '''Suma o resta el monto de una transacción a su tipo.'''
+        self.rows += sign
+        if model in self.totals and amount is not None and not pd.isna(amount):
+            self.totals[model] += sign * float(amount)
+
+    def add_frame(self, df: pd.DataFrame, sign: int = 1) -> None:
+        '''Suma o resta los montos de un bloque de transacciones de forma vectorizada.'''
+        if df.empty:
+            return
+        self.rows += sign * len(df)
+        sums = df.groupby('Model', observed=True)['Amount'].sum()
+        for model in self.MODELS:
+            if model in sums.index:
+                self.totals[model] += sign * float(sums[model])
+
+    def rebuild(self, df: pd.DataFrame) -> None:
+        '''Recalcula los totales a partir de todas las transacciones.'''
+        self.totals = {model: 0.0 for model in self.MODELS}
+        self.rows = 0
+        self.add_frame(df)
+
+    def balance(self) -> float:
+        '''Ingresos menos gastos.'''
+        return self.totals['income'] - self.totals['expense']
+
+    def matches(self, other: dict) -> bool:
+        '''Compara con otros totales tolerando errores de redondeo acumulados.'''
+        return all(math.isclose(self.totals[model], other.get(model, 0.0), rel_tol=1e-9, abs_tol=1e-6)
+                   for model in self.MODELS)
+
+
+class ExpenseCube:
+    ''' Cubo de gastos agregados por (año, mes, día, categoría).
+    Guarda la suma y el número de gastos de cada celda y se actualiza con cada
+    alta, edición o baja, de modo que los resúmenes por periodo no recorren las
+    transacciones originales.
+    Atributos:
+        cells (dict): año -> mes -> {(día, categoría): [suma, cantidad]}.
+    Métodos:
+        add: Suma o resta un gasto en su celda.
+        add_frame: Suma o resta un bloque de gastos.
+        rebuild: Reconstruye el cubo desde cero.
+        is_empty: Indica si no hay gastos registrados.
+        records: Celdas de un rango de fechas como DataFrame (lo usan las consultas).
+    '''
+
+    def __init__(self):
+        self.cells = {}
+
+    def _add_cell(self, year: int, month: int, day: int, category, amount: float, count: int) -> None:
+        '''Suma a una celda y la elimina si queda sin gastos.'''
+        # NaN no sirve como clave de diccionario #
+        category = None if pd.isna(category) else category
+        months = self.cells.setdefault(year, {})
+        days = months.setdefault(month, {})
+        cell = days.setdefault((day, category), [0.0, 0])
+        cell[0] += amount
+        cell[1] += count
+        if cell[1] <= 0:
+            del days[(day, category)]
+            if not days:
+                del months[month]
+            if not months:
+                del self.cells[year]
+
+    def add(self, date, category, amount: float, sign: int = 1) -> None:
+        '''Suma (sign=1) o resta (sign=-1) un gasto en su celda.'''
+        if date is None or pd.isna(date):
+            return
+        amount = 0.0 if amount is None or pd.isna(amount) else float(amount)
+        self._add_cell(date.year, date.month, date.day, category, sign * amount, sign)
+
+    def add_frame(self, df: pd.DataFrame, sign: int = 1) -> None:
+        '''Suma o resta un bloque de gastos agrupándolo antes de tocar el cubo.'''
+        df = df[(df['Model'] == 'expense') & df['Date'].notna()]
+        if df.empty:
+            return
+        dates = df['Date'].dt
+        grouped = df.groupby([dates.year, dates.month, dates.day, df['Category']],
+                             dropna=False, observed=True)['Amount'].agg(['sum', 'size'])
+        for (year, month, day, category), (total, count) in grouped.iterrows():
+            self._add_cell(int(year), int(month), int(day), category, sign * float(total), sign * int(count))
+
+    def rebuild(self, df: pd.DataFrame) -> None:
+        '''Reconstruye el cubo a partir de todas las transacciones.'''
+        self.cells = {}
+        self.add_frame(df)
+
+    def is_empty(self) -> bool:
+        '''Indica si no hay gastos registrados.'''
+        return not self.cells
+
+    def records(self, start: pd.Timestamp = None, end: pd.Timestamp = None,
+                day: bool = True, category: bool = True) -> pd.DataFrame:
+        '''Gastos entre los días de start y end (incluidos) como filas (Years, Month, Day,
+        Category, Amount). Con day o category en False las celdas se suman sin distinguir
+        el día (Day = 0) o la categoría (Category = None). Los años y meses fuera del rango
+        se descartan sin recorrer sus celdas.'''
+        first = (start.year, start.month, start.day) if start is not None else None
+        last = (end.year, end.month, end.day) if end is not None else None
+        totals = {}
+        for year, months in self.cells.items():
+            if (first and year < first[0]) or (last and year > last[0]):
+                continue
+            for month, days in months.items():
+                if (first and (year, month) < first[:2]) or (last and (year, month) > last[:2]):
+                    continue
+                # Solo en los meses de los extremos hay que mirar el día #
+                edge = (first and (year, month) == first[:2]) or (last and (year, month) == last[:2])
+                if not (edge or day or category):
+                    key = (year, month, 0, None)
+                    totals[key] = totals.get(key, 0.0) + sum(cell[0] for cell in days.values())
+                    continue
+                for (cell_day, cell_category), cell in days.items():
+                    if edge and ((first and (year, month, cell_day) < first) or
+                                 (last and (year, month, cell_day) > last)):
+                        continue
+                    key = (year, month, cell_day if day else 0, cell_category if category else None)
+                    totals[key] = totals.get(key, 0.0) + cell[0]
+        return pd.DataFrame([(*key, amount) for key, amount in totals.items()],
+                            columns=['Years', 'Month', 'Day', 'Category', 'Amount'])
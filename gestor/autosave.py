@@ -0,0 +1,79 @@
+import asyncio
+
+
+class AutoSaver:
+    ''' Guardado automático en segundo plano con agrupación de cambios.
+    Cada cambio en las transacciones se anota con notify; la sincronización del diario
+    de cambios (un solo fsync para todos los registros escritos) se programa en el
+    bucle de asyncio para dentro de delay segundos y se reprograma con cada cambio
+    nuevo, de modo que una ráfaga de altas o ediciones produce una sola sincronización.
+    max_delay limita cuánto puede retrasarse si los cambios no paran. El fsync corre
+    en el ejecutor por defecto del bucle, así que el menú no lo espera. Compactar
+    (guardar la instantánea completa) solo se hace con flush, al salir, o en el gestor
+    cuando el diario supera su tamaño máximo.
+    Atributos:
+        manager (FinanceManager): Gestor cuyas transacciones se guardan.
+        delay (float): Segundos sin cambios antes de sincronizar.
+        max_delay (float): Segundos máximos desde el primer cambio sin sincronizar.
+        syncs (int): Número de sincronizaciones del diario realizadas.
+        saves (int): Número de compactaciones realizadas.
+        last_path (str): Archivo de la última compactación.
+    Métodos:
+        notify: Anota un cambio y programa la sincronización.
+        flush: Compacta en el momento los cambios pendientes.
+    '''
+
+    def __init__(self, manager, delay: float = 2.0, max_delay: float = 30.0):
+        self.manager = manager
+        self.delay = delay
+        self.max_delay = max_delay
+        self.syncs = 0
+        self.saves = 0
+        self.last_path = None
+        self.dirty = False
+        self.changes = 0
+        self._first_change = None
+        self._timer = None
+
+    def notify(self) -> None:
+        '''Anota un cambio y (re)programa la sincronización dentro de delay segundos.'''
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if not self.dirty:
+            self._first_change = now
+        self.dirty = True
+        self.changes += 1
+        if self._timer is not None:
+            self._timer.cancel()
+        when = min(now + self.delay, self._first_change + self.max_delay)
+        self._timer = loop.call_at(when, self._sync)
+
+    def _sync(self) -> None:
+        '''Sincroniza el diario en otro hilo si hay cambios sin sincronizar.'''
+        self._timer = None
+        if not self.dirty:
+            return
+        self.dirty = False
+        future = asyncio.get_running_loop().run_in_executor(None, self.manager.sync_journal)
+        future.add_done_callback(self._synced)
+
+    def _synced(self, future) -> None:
+        '''Cuenta la sincronización terminada; si falló, los cambios quedan pendientes.'''
+        if future.cancelled() or future.exception() is not None:
+            self.dirty = True
+            return
+        self.syncs += 1
+
+    def flush(self, force: bool = False) -> str:
+        '''Compacta ya los cambios pendientes (o siempre si force es True) y cancela el temporizador.'''
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not (force or self.changes):
+            return self.last_path
+        self.last_path = self.manager.compact()
+        # Solo se da por guardado si compact terminó sin errores #
+        self.dirty = False
+        self.changes = 0
+        self.saves += 1
+        return self.last_path
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import pickle
+
+
+class ParseCache:
+    ''' Caché binaria de archivos de datos ya leídos y validados.
+    Cada entrada se guarda en un pickle dentro de data/.cache y se identifica por la
+    ruta del archivo; solo se usa si coinciden tamaño, fecha de modificación y hash
+    del contenido. Si no coinciden la entrada se descarta y se vuelve a generar.
+    El número de entradas está limitado y se eliminan las menos usadas (LRU).
+    Atributos:
+        directory (str): Carpeta donde se guardan las entradas.
+        max_entries (int): Número máximo de entradas.
+    Métodos:
+        get: Devuelve el resultado guardado de un archivo si sigue siendo válido.
+        put: Guarda el resultado de leer un archivo.
+    '''
+
+    def __init__(self, directory: str = os.path.join('data', '.cache'), max_entries: int = 16):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    @staticmethod
+    def fingerprint(path: str) -> tuple:
+        '''Ruta absoluta, tamaño, fecha de modificación y hash del contenido del archivo.'''
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha1').hexdigest()
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest
+
+    def _entry_path(self, path: str) -> str:
+        '''Archivo de la entrada correspondiente a una ruta.'''
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, path: str):
+        '''Devuelve el resultado guardado para el archivo o None si no existe o está desactualizado.'''
+        entry = self._entry_path(path)
+        try:
+            with open(entry, 'rb') as f:
+                fingerprint, result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if fingerprint != self.fingerprint(path):
+            # El archivo cambió: la entrada ya no sirve #
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+            return None
+        # Se actualiza la fecha de la entrada para el orden LRU #
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return result
+
+    def put(self, path: str, result) -> None:
+        '''Guarda el resultado de leer el archivo y aplica el límite de entradas.'''
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry_path(path)
+        tmp_path = f'{entry}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self.fingerprint(path), result), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry)
+        self._evict()
+
+    def _evict(self) -> None:
+        '''Elimina las entradas usadas hace más tiempo si se supera el límite.'''
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                full = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(full), full))
+                except OSError:
+                    continue # Otro proceso la eliminó
+        entries.sort()
+        for _, full in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
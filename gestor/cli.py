@@ -0,0 +1,249 @@
+''' Modo por comandos del gestor de finanzas.
+Permite ejecutar una operación (o un archivo con muchas) sin pasar por el menú:
+
+    python main.py import data/banco.csv
+    python main.py add expense 25.5 Comida "Almuerzo" --date "01-06-2024 13:00:00"
+    python main.py report monthly --year 2024 --month 6 --format csv
+    python main.py run operaciones.txt
+
+Los datos se cargan una sola vez al empezar y se guardan una sola vez al terminar
+si alguna operación los modificó. La salida es JSON (una línea por operación) o CSV.
+'''
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import sys
+import pandas as pd
+from gestor.core import FinanceManager
+from gestor.instrumentation import Instrumentation, profile
+from gestor.transactions import Transactions
+
+COMMANDS = ('import', 'add', 'report', 'search', 'chart', 'run')
+# Operaciones que modifican las transacciones #
+MUTATIONS = ('import', 'add')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    '''Parser de los comandos; se usa tanto para la línea de comandos como para cada línea de un archivo.'''
+    parser = argparse.ArgumentParser(prog='main.py', description='Gestor de finanzas por comandos.')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json', help='Formato de salida.')
+    parser.add_argument('--stats', action='store_true',
+                        help='Escribe en stderr el tiempo, filas y bytes de cada método llamado (JSON).')
+    parser.add_argument('--profile', action='store_true',
+                        help='Perfila la operación con cProfile y tracemalloc y escribe el informe en stderr.')
+    # --format también se acepta después del comando #
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--format', choices=['json', 'csv'], default=argparse.SUPPRESS, help='Formato de salida.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cmd = commands.add_parser('import', parents=[common], help='Importa transacciones desde archivos xlsx o csv.')
+    cmd.add_argument('paths', nargs='+')
+
+    cmd = commands.add_parser('add', parents=[common], help='Añade una transacción.')
+    cmd.add_argument('model', choices=['income', 'expense'])
+    cmd.add_argument('amount', type=float)
+    cmd.add_argument('category')
+    cmd.add_argument('description', nargs='?', default='')
+    cmd.add_argument('--date', default=None, help="Fecha 'dd-mm-YYYY HH:MM:SS' (por defecto ahora).")
+
+    cmd = commands.add_parser('report', parents=[common], help='Resúmenes de gastos.')
+    cmd.add_argument('period', choices=['monthly', 'annual', 'category'])
+    cmd.add_argument('--year')
+    cmd.add_argument('--month')
+    cmd.add_argument('--daily', action='store_true', help='En monthly, gastos por día y categoría.')
+    cmd.add_argument('--all-years', action='store_true', help='En annual, los últimos 10 años.')
+
+    cmd = commands.add_parser('search', parents=[common], help='Busca transacciones.')
+    cmd.add_argument('--model')
+    cmd.add_argument('--category')
+    cmd.add_argument('--description')
+    cmd.add_argument('--start', help="Fecha inicio 'dd-mm-YYYY HH:MM:SS'.")
+    cmd.add_argument('--end', help="Fecha fin 'dd-mm-YYYY HH:MM:SS'.")
+
+    cmd = commands.add_parser('chart', parents=[common], help='Genera gráficos PNG en images/ sin mostrarlos.')
+    cmd.add_argument('kind', choices=['monthly', 'daily', 'annual', 'year', 'timeseries'])
+    cmd.add_argument('--year')
+    cmd.add_argument('--month')
+    cmd.add_argument('--start', help='Fecha inicio YYYY-MM-DD (timeseries).')
+    cmd.add_argument('--end', help='Fecha fin YYYY-MM-DD (timeseries).')
+
+    cmd = commands.add_parser('run', parents=[common], help='Ejecuta las operaciones de un archivo (una por línea).')
+    cmd.add_argument('file')
+    return parser
+
+
+class CommandRunner:
+    ''' Ejecuta comandos sobre un único FinanceManager.
+    Atributos:
+        manager (FinanceManager): Gestor con los datos cargados.
+        output_format (str): 'json' o 'csv'.
+        out: Flujo donde se escriben los resultados.
+        changed (bool): Si alguna operación modificó las transacciones.
+        failed (int): Número de operaciones con error.
+    Métodos:
+        execute: Ejecuta un comando ya interpretado.
+        run_file: Ejecuta las operaciones de un archivo.
+        emit: Escribe el resultado de una operación.
+    '''
+
+    def __init__(self, manager: FinanceManager, output_format: str = 'json', out=None):
+        self.manager = manager
+        self.output_format = output_format
+        self.out = out or sys.stdout
+        self.changed = False
+        self.failed = 0
+        self._graphs = None
+
+    def _charts(self):
+        '''Generador de gráficos headless (se crea la primera vez que se pide un gráfico).'''
+        if self._graphs is None:
+            from gestor.visualizations import Graphs
+            self._graphs = Graphs(self.manager, headless=True)
+        return self._graphs
+
+    def emit(self, command: str, result) -> None:
+        '''Escribe el resultado: una línea JSON o una tabla CSV por operación.'''
+        if isinstance(result, pd.Series):
+            result = result.reset_index()
+        if self.output_format == 'json':
+            if isinstance(result, pd.DataFrame):
+                payload = {'command': command, 'status': 'ok',
+                           'rows': json.loads(result.to_json(orient='records', date_format='iso'))}
+            else:
+                payload = {'command': command, **result}
+            self.out.write(json.dumps(payload, ensure_ascii=False, default=str) + '\n')
+        else:
+            if not isinstance(result, pd.DataFrame):
+                result = pd.DataFrame([{'command': command, **result}])
+            result.to_csv(self.out, index=False)
+            self.out.write('\n')
+
+    def execute(self, args: argparse.Namespace):
+        '''Ejecuta un comando y devuelve su resultado (DataFrame, Series o diccionario).'''
+        manager = self.manager
+        if args.command == 'import':
+            before = len(manager)
+            errors_before = len(manager.errors)
+            for path in args.paths:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f'Archivo no encontrado: {path}')
+                manager.load_file(path)
+            # Solo se listan los errores guardados; error_count incluye también los que superan el límite #
+            errors = manager.errors.frame(since=errors_before)
+            return {'status': 'ok', 'added': len(manager) - before, 'error_count': len(manager.errors) - errors_before,
+                    'errors': errors['Message'].tolist()}
+        if args.command == 'add':
+            manager.add_transaction(Transactions(args.model, abs(args.amount), args.category,
+                                                 args.description, args.date))
+            return {'status': 'ok', 'added': 1, 'index': len(manager) - 1}
+        if args.command == 'report':
+            if args.period == 'category':
+                resumen = manager.expenses_by_category()
+                return resumen if not resumen.empty else {'status': 'no_data'}
+            if args.period == 'monthly':
+                status, resumen = manager.monthly_expenses(args.year, args.month, daily=args.daily)
+            else:
+                status, resumen = manager.anual_expenses(args.year, all_years=args.all_years)
+            return resumen if status == 'ok' else {'status': status}
+        if args.command == 'search':
+            found = manager.search_transactions(model=args.model, category=args.category,
+                                                description=args.description,
+                                                start_date=args.start, end_date=args.end)
+            # La posición es la que usan editar y eliminar #
+            return found.rename_axis('Index').reset_index() if not found.empty else found
+        if args.command == 'chart':
+            return self._chart(args)
+        raise ValueError(f'Comando no permitido aquí: {args.command}')
+
+    def _chart(self, args: argparse.Namespace) -> dict:
+        '''Genera los gráficos pedidos y devuelve sus rutas.'''
+        graphs = self._charts()
+        year = int(args.year) if args.year else pd.Timestamp.now().year
+        month = int(args.month) if args.month else pd.Timestamp.now().month
+        if args.kind == 'year':
+            return {'status': 'ok', 'paths': graphs.render_batch(graphs.year_charts(year))}
+        if args.kind == 'timeseries':
+            df, title, graph_type = graphs.timeseries_chart(args.start, args.end)
+            if df.empty:
+                return {'status': 'no_data'}
+            return {'status': 'ok', 'paths': [graphs.render(df, title, graph_type)]}
+        if args.kind == 'annual':
+            status, resumen = self.manager.anual_expenses(year)
+            if status != 'ok':
+                return {'status': status}
+            resumen = resumen.reindex(range(1, 13), fill_value=0).reset_index()
+            return {'status': 'ok', 'paths': [graphs.render(resumen, f'Gasto anual del {year}')]}
+        daily = args.kind == 'daily'
+        status, resumen = self.manager.monthly_expenses(year, month, daily=daily)
+        if status != 'ok':
+            return {'status': status}
+        title = f"Gastos {'Diarios' if daily else 'Mensuales'} {month}-{year}"
+        return {'status': 'ok', 'paths': [graphs.render(resumen, title, 'lineplot' if daily else 'pie')]}
+
+    def run(self, args: argparse.Namespace) -> None:
+        '''Ejecuta un comando y escribe su resultado; los errores se informan y no detienen el lote.'''
+        try:
+            result = self.execute(args)
+        except (ValueError, OSError) as e:
+            self.failed += 1
+            self.emit(args.command, {'status': 'error', 'error': type(e).__name__, 'message': str(e)})
+            return
+        if args.command in MUTATIONS:
+            self.changed = True
+        self.emit(args.command, result)
+
+    def run_file(self, path: str, parser: argparse.ArgumentParser) -> None:
+        '''Ejecuta cada línea de un archivo como un comando; se ignoran las vacías y las que empiezan por #.'''
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                # argparse escribe el error en stderr y sale: se captura para informarlo en la salida #
+                messages = io.StringIO()
+                try:
+                    with contextlib.redirect_stderr(messages):
+                        args = parser.parse_args(shlex.split(line))
+                    if args.command == 'run':
+                        raise ValueError('run no se puede anidar')
+                except (SystemExit, ValueError) as e:
+                    detail = messages.getvalue().strip().splitlines()[-1:] or [str(e)]
+                    self.failed += 1
+                    self.emit('run', {'status': 'error', 'error': 'ValueError',
+                                      'message': f'Línea {number} inválida: {detail[0]}'})
+                    continue
+                self.run(args)
+
+
+def main(argv: list = None, manager: FinanceManager = None, out=None) -> int:
+    '''Punto de entrada del modo por comandos. Retorna 0 si todo fue bien y 1 si alguna operación falló.'''
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    instrumentation = Instrumentation(log_interval=None).enable() if args.stats else None
+    try:
+        with profile() if args.profile else contextlib.nullcontext():
+            if manager is None:
+                # Una sola carga al empezar #
+                manager = FinanceManager(journal_path=os.path.join('data', 'journal.jsonl'))
+                manager.recover()
+            runner = CommandRunner(manager, args.format, out)
+            if args.command == 'run':
+                try:
+                    runner.run_file(args.file, parser)
+                except OSError as e:
+                    runner.failed += 1
+                    runner.emit('run', {'status': 'error', 'error': type(e).__name__, 'message': str(e)})
+            else:
+                runner.run(args)
+            # Y un solo guardado al terminar #
+            if runner.changed:
+                manager.compact()
+    finally:
+        if instrumentation is not None:
+            instrumentation.disable()
+            # En stderr para no mezclarlo con la salida de las operaciones #
+            sys.stderr.write(json.dumps(instrumentation.snapshot(), ensure_ascii=False) + '\n')
+    return 1 if runner.failed else 0
@@ -1,7 +1,76 @@
-from gestor.transactions import Transactions
+from gestor.transactions import Transactions, TransactionRecord
+from gestor.journal import Journal
+from gestor.storage import COLUMNS
+from gestor.aggregates import RunningTotals, ExpenseCube
+from gestor.indexes import DateIndex, TextIndex
+from gestor.cache import ParseCache
+from gestor.errors import ErrorCollector
+from gestor.query import Query, read_only_view
 import pandas as pd
+import numpy as np
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
+
+
+def validate_frame(df: pd.DataFrame, date_format: str, row_offset: int = 2) -> tuple:
+    '''Valida y convierte un DataFrame crudo columna por columna.
+    Retorna el DataFrame con las filas válidas y una lista de errores (tipo, mensaje, fila, columna)
+    con el número de fila del archivo (row_offset compensa el encabezado).'''
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        return pd.DataFrame(columns=COLUMNS), [('KeyError', f'Columnas faltantes en el archivo: {missing}',
+                                                None, ', '.join(missing))]
+
+    # Monto: cualquier valor no numérico es un error (los vacíos se aceptan como en float()) #
+    amount = pd.to_numeric(df['Amount'], errors='coerce')
+    bad_amount = amount.isna() & df['Amount'].notna()
+    # Fecha: se convierte toda la columna de una vez con el formato fijo #
+    dates = pd.to_datetime(df['Date'], format=date_format, errors='coerce')
+    bad_date = dates.isna()
+
+    errors = []
+    for idx in df.index[bad_amount | bad_date]:
+        column = 'Amount' if bad_amount[idx] else 'Date'
+        # Solo el valor de la celda (recortado), no la fila completa #
+        value = repr(df.at[idx, column])[:40]
+        errors.append(('ValueError', f'Error al procesar la fila {idx + row_offset}: {column} inválido ({value})',
+                       int(idx) + row_offset, column))
+
+    ok = ~(bad_amount | bad_date)
+    valid = pd.DataFrame({
+        'Model': df.loc[ok, 'Model'],
+        'Amount': amount[ok].astype('float'),
+        'Category': df.loc[ok, 'Category'],
+        'Description': df.loc[ok, 'Description'],
+        'Date': dates[ok].astype('datetime64[ns]')
+    })
+    return valid, errors
+
+
+def read_data_file(path: str, date_format: str, cache: ParseCache = None) -> tuple:
+    '''Lee y valida un archivo de datos (xlsx o csv); se ejecuta en los procesos del pool.
+    Si se indica una caché, los archivos sin cambios no se vuelven a leer ni validar.
+    Retorna (ruta, filas válidas, errores) con el nombre del archivo en cada mensaje.'''
+    name = os.path.basename(path)
+    try:
+        cached = cache.get(path) if cache is not None else None
+        if cached is None:
+            if path.endswith('.csv'):
+                df = pd.read_csv(path, dtype={'Model': 'str', 'Category': 'str', 'Description': 'str', 'Date': 'str'})
+            else:
+                df = pd.read_excel(path)
+            cached = validate_frame(df, date_format)
+            if cache is not None:
+                cache.put(path, cached)
+    except (OSError, ValueError) as e:
+        return path, pd.DataFrame(columns=COLUMNS), [(type(e).__name__, f'{name}: {e}', None, None)]
+    valid, errors = cached
+    # Ocurrencia de cada fila dentro del archivo: las repetidas legítimas no se pierden al deduplicar #
+    valid['Occurrence'] = valid.groupby(COLUMNS, dropna=False, observed=True).cumcount()
+    return path, valid, [(error, f'{name}: {message}', *location) for error, message, *location in errors]
+
+
 class FinanceManager:
     ''' Clase para gestionar las transacciones financieras.
     Esta clase permite cargar, guardar y manipular transacciones financieras,
@@ -9,29 +78,90 @@ class FinanceManager:
     Atributos:
         transactions_list (List[Transactions]): Lista de transacciones financieras.
         DATE_FORMAT (str): Formato de fecha y hora utilizado para las transacciones.
-        ERROR (pd.DataFrame): DataFrame para registrar errores durante la carga de transacciones.
+        errors (ErrorCollector): Errores de carga de este gestor (acotados a MAX_ERRORS guardados).
+        ERROR (pd.DataFrame): DataFrame con los errores registrados, construido al pedirlo.
+        MAX_ERRORS (int): Errores que se guardan como máximo; los demás solo se cuentan por tipo.
+        JOURNAL_MAX_BYTES (int): Tamaño del diario de cambios a partir del cual se compacta.
+        CSV_CHUNK_ROWS (int): Filas por bloque al importar o exportar CSV.
+        journal (Journal): Diario de cambios opcional donde se registran altas, ediciones y bajas.
+        storage (SQLiteStorage): Almacenamiento SQLite opcional; si se indica, las transacciones
+            no se cargan en memoria y las consultas se resuelven en la base de datos.
+        totals (RunningTotals): Totales acumulados de ingresos y gastos.
+        cube (ExpenseCube): Gastos agregados por (año, mes, día, categoría) que sirven los
+            resúmenes por periodo cuando las transacciones están en memoria.
+        date_index (DateIndex): Índice lateral ordenado por fecha para búsquedas por rango.
+        text_index (dict): Índices invertidos (TextIndex) de Category y Description.
+        layout (dict): Tipo de cada columna. Model y Category son categóricas (cada valor
+            distinto se guarda una sola vez) y Description también si compact_descriptions es True.
+        check_consistency (bool): Si es True, total_balance compara los totales acumulados
+            con un recálculo completo y lanza RuntimeError si no coinciden.
+        period_versions (dict): Versión de cada (año, mes); aumenta con cada cambio en ese
+            periodo y permite saber qué resúmenes o gráficos hay que regenerar.
+        parse_cache (ParseCache): Caché en data/.cache de los archivos ya leídos y validados;
+            None para leer siempre el archivo.
+        PARSE_CACHE_ENTRIES (int): Número máximo de archivos guardados en la caché.
     Métodos:
         load_csv: Carga transacciones desde un archivo CSV.
         load_excel: Carga transacciones desde un archivo Excel.
+        load_all: Carga en paralelo todos los archivos de data/ sin repetir transacciones.
+        load_file: Carga transacciones desde un archivo xlsx o csv concreto.
+        save_arrow: Guarda una instantánea columnar en formato Arrow IPC.
+        load_arrow: Carga transacciones desde una instantánea Arrow.
+        read_arrow: Lee solo algunas columnas de una instantánea Arrow mapeada en memoria.
         save_csv: Guarda transacciones en un archivo CSV.
+        recover: Carga la última instantánea y reaplica el diario de cambios.
+        sync_journal: Asegura en disco el diario de cambios.
+        compact: Guarda una instantánea y vacía el diario de cambios.
         add_transaction: Añade una nueva transacción a la lista.
+        add_transactions: Añade un lote de transacciones con una sola unión al DataFrame.
+        flush: Une las transacciones pendientes al DataFrame.
         total_balance: Calcula el balance total de las transacciones.
+        query: Consulta diferida y combinable (tipo, fechas, textos, agrupación).
         expenses: Calcula los gastos totales por categoría agrupados por mes y año.
+        expenses_by_category: Gastos totales por categoría sin recorrer las transacciones.
         monthly_expenses: Calcula los gastos mensuales por categoría o por día.
+        daily_expenses: Serie de gastos por día para gráficos de varios años.
         anual_expenses: Calcula los gastos anuales o los gastos de los últimos 10 años.
+        memory_report: Informa de la memoria usada por columna y por fila.
+        period_version: Versión de los datos de un mes o de un año.
     ''' 
     
     DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
-    ERROR = pd.DataFrame(columns=['Error','Message'])
-    
-    def __init__(self):
-        self.df_transactions = pd.DataFrame({
-            'Model': pd.Series(dtype='str'),
-            'Amount': pd.Series(dtype='float'),
-            'Category': pd.Series(dtype='str'),
-            'Description': pd.Series(dtype='str'),
-            'Date': pd.Series(dtype='datetime64[ns]')
-        })
+    MAX_ERRORS = 1000
+    JOURNAL_MAX_BYTES = 1_000_000
+    CSV_CHUNK_ROWS = 50_000
+    PARSE_CACHE_ENTRIES = 16
+
+    def __init__(self, journal_path: str = None, storage=None, compact_descriptions: bool = False):
+        # Model y Category repiten pocos valores: como categóricas solo se guarda un código por fila #
+        self.layout = {
+            'Model': 'category',
+            'Amount': 'float',
+            'Category': 'category',
+            'Description': 'category' if compact_descriptions else 'str',
+            'Date': 'datetime64[ns]'
+        }
+        self.df_transactions = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in self.layout.items()})
+        # Área de preparación: filas sueltas por columna y bloques pendientes de unir #
+        self._staging = {col: [] for col in COLUMNS}
+        self._pending = []
+        if journal_path and storage is not None:
+            raise ValueError('El diario de cambios solo se usa sin almacenamiento SQLite')
+        self.storage = storage
+        self.snapshot_path = None
+        self.journal = Journal(journal_path) if journal_path else None
+        self._replaying = False
+        self.totals = RunningTotals()
+        self.cube = ExpenseCube()
+        self.date_index = DateIndex()
+        self.text_index = {'Category': TextIndex(), 'Description': TextIndex()}
+        self.check_consistency = False
+        self.period_versions = {}
+        self._generation = 0
+        self.parse_cache = ParseCache(max_entries=self.PARSE_CACHE_ENTRIES)
+        self.errors = ErrorCollector(self.MAX_ERRORS)
+        if storage is not None:
+            self._rebuild()
 
 #########################################
 #Cargar y Salvar Archivos Excel#
@@ -42,44 +172,440 @@ class FinanceManager:
         files = glob.glob(os.path.join('data', 'data_*.xlsx'))
         try:
             latest_file = max(files, key=os.path.getctime)
-            df = pd.read_excel(latest_file)
-
-            #Iterando sobre filas y columnas en este caso omite las columnas#
-            for _, row in df.iterrows(): 
-                try:
-                    t = Transactions(
-                        row['Model'],
-                        float(row['Amount']),
-                        row['Category'],
-                        row['Description'],
-                        row['Date']
-                    )
-                    # Creando el DF concatenando los atributos de la clase Transactions y los del propio DataFrame
-                    self.df_transactions = pd.concat([self.df_transactions, 
-                                                        pd.DataFrame([t.__dict__])], 
-                                                        ignore_index=True)
-                    
-                    # Formateando la columna Date a tipo datetime#
-                    self.convert_date(self.df_transactions, 'Date', 'to_datetime')
-                except (KeyError, ValueError) as e:
-                    self.ERROR=self.errors_register(e, f'Error al procesar la fila: {row}')
-            return self.ERROR if not self.ERROR.empty else None
+            # Si el archivo no cambió desde la última lectura se usa el resultado guardado #
+            cached = self.parse_cache.get(latest_file) if self.parse_cache is not None else None
+            if cached is None:
+                df = pd.read_excel(latest_file)
+                # Validando columna por columna en vez de fila por fila #
+                cached = validate_frame(df, self.DATE_FORMAT)
+                if self.parse_cache is not None:
+                    self.parse_cache.put(latest_file, cached)
+            self.snapshot_path = latest_file
+            valid, errors = cached
+            if errors:
+                self.errors.extend(errors)
+            # Una sola concatenación (o inserción) para todo el archivo #
+            self._append_frame(valid)
+            return self.ERROR if self.errors.total else None
         except (FileNotFoundError, ValueError) as e:
-            self.ERROR=self.errors_register(e, f'Archivo no encontrado en ruta {files}')
-            return self.ERROR if not self.ERROR.empty else None
+            self.errors.add(e, f'Archivo no encontrado en ruta {files}')
+            return self.ERROR if self.errors.total else None
+
+    def load_all(self, workers: int = None) -> pd.DataFrame:
+        '''Carga todos los archivos data_*.xlsx y data_*.csv de data/ en paralelo.
+        Cada archivo se lee en un proceso; luego se unen en orden de fecha y se eliminan
+        las transacciones repetidas entre archivos usando todas sus columnas como clave.'''
+        files = sorted(glob.glob(os.path.join('data', 'data_*.xlsx')) + glob.glob(os.path.join('data', 'data_*.csv')))
+        if not files:
+            self.errors.add(FileNotFoundError(), f'Archivo no encontrado en ruta {files}')
+            return self.ERROR
+        if workers == 1 or len(files) == 1:
+            results = [read_data_file(path, self.DATE_FORMAT, self.parse_cache) for path in files]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_data_file, files, [self.DATE_FORMAT] * len(files),
+                                        [self.parse_cache] * len(files)))
+
+        errors = [error for _, _, file_errors in results for error in file_errors]
+        if errors:
+            self.errors.extend(errors)
+        frames = [valid for _, valid, _ in results if not valid.empty]
+        if frames:
+            merged = pd.concat(frames, ignore_index=True)
+            # Orden estable por fecha y una sola copia de cada transacción #
+            merged = merged.sort_values('Date', kind='stable')
+            merged = merged.drop_duplicates(subset=COLUMNS + ['Occurrence'])
+            self._append_frame(merged[COLUMNS].reset_index(drop=True))
+        return self.ERROR if self.errors.total else None
+
+    def load_file(self, path: str) -> pd.DataFrame:
+        '''Carga transacciones desde un archivo concreto (xlsx o csv) sin buscar en data/.'''
+        if path.endswith('.csv'):
+            return self.load_csv(path)
+        _, valid, errors = read_data_file(path, self.DATE_FORMAT, self.parse_cache)
+        if errors:
+            self.errors.extend(errors)
+        self._append_frame(valid[COLUMNS])
+        return self.ERROR if self.errors.total else None
 
     def save_excel(self) -> str:
         '''Guarda transacciones en un archivo Excel.'''
         #Asegurandonos de que el directorio existe
         os.makedirs('data', exist_ok=True) 
-        #Formateando columna Date antes de guardar
-        self.convert_date(self.df_transactions, 'Date', 'to_string')
+        #Formateando columna Date en una copia para no alterar el DataFrame en memoria
+        df = self._all_rows().copy()
+        self.convert_date(df, 'Date', 'to_string')
         #Guardando el DataFrame en un archivo Excel con la fecha actual
         filename = f"data_{pd.Timestamp.now().strftime('%Y-%m-%d')}.xlsx"
         path = os.path.join('data', filename)
-        self.df_transactions.to_excel(path, index=False)
+        df.to_excel(path, index=False)
+        self.snapshot_path = path
         return path     
 
+#########################################
+#Importar y exportar CSV por bloques#
+#########################################
+
+    def _read_csv_chunks(self, path: str, chunksize: int):
+        '''Lee el CSV por bloques; el índice continúa entre bloques.'''
+        yield from pd.read_csv(path, chunksize=chunksize,
+                               dtype={'Model': 'str', 'Category': 'str', 'Description': 'str', 'Date': 'str'})
+
+    def _validate_chunks(self, chunks):
+        '''Valida y convierte cada bloque (incluida la fecha) sin acumularlos.'''
+        for chunk in chunks:
+            yield validate_frame(chunk, self.DATE_FORMAT)
+
+    def load_csv(self, path: str = None, chunksize: int = None) -> pd.DataFrame:
+        '''Carga transacciones desde un archivo CSV (el más reciente de data/ si no se indica ruta).
+        El archivo se procesa por bloques: leer -> validar -> convertir fechas -> añadir,
+        así la memoria usada por la importación depende del tamaño del bloque.'''
+        files = [path] if path else glob.glob(os.path.join('data', 'data_*.csv'))
+        try:
+            latest_file = max(files, key=os.path.getctime)
+            chunks = self._read_csv_chunks(latest_file, chunksize or self.CSV_CHUNK_ROWS)
+            for valid, errors in self._validate_chunks(chunks):
+                if errors:
+                    self.errors.extend(errors)
+                self._append_frame(valid)
+            return self.ERROR if self.errors.total else None
+        except (FileNotFoundError, ValueError) as e:
+            self.errors.add(e, f'Archivo no encontrado en ruta {files}')
+            return self.ERROR if self.errors.total else None
+
+    def _iter_chunks(self, chunksize: int):
+        '''Recorre todas las transacciones por bloques sin copiar el DataFrame completo.'''
+        if self.storage is not None:
+            yield from self.storage.iter_chunks(chunksize)
+            return
+        df = self.df_transactions
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+    def save_csv(self, path: str = None, chunksize: int = None) -> str:
+        '''Guarda transacciones en un archivo CSV escribiendo bloque a bloque con la fecha en DATE_FORMAT.'''
+        if path is None:
+            os.makedirs('data', exist_ok=True)
+            path = os.path.join('data', f"data_{pd.Timestamp.now().strftime('%Y-%m-%d')}.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            header = True
+            for chunk in self._iter_chunks(chunksize or self.CSV_CHUNK_ROWS):
+                # Solo se formatea la fecha del bloque que se está escribiendo #
+                chunk = chunk.assign(Date=chunk['Date'].dt.strftime(self.DATE_FORMAT))
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+            if header:
+                pd.DataFrame(columns=COLUMNS).to_csv(f, index=False)
+        return path
+
+#########################################
+#Instantáneas columnares (Arrow IPC)#
+#########################################
+
+    def save_arrow(self) -> str:
+        '''Guarda una instantánea columnar en formato Arrow IPC.
+        Model y Category se guardan como columnas diccionario y Date como timestamp nativo.'''
+        import pyarrow as pa
+        os.makedirs('data', exist_ok=True)
+        df = self._all_rows().astype({'Model': 'category', 'Category': 'category'})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        filename = f"data_{pd.Timestamp.now().strftime('%Y-%m-%d')}.arrow"
+        path = os.path.join('data', filename)
+        # Se escribe aparte y se reemplaza: la instantánea cargada sigue mapeada en memoria
+        # y sobrescribirla en el sitio corrompería los datos que se están usando #
+        tmp_path = path + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        self.snapshot_path = path
+        return path
+
+    @staticmethod
+    def read_arrow(path: str, columns: list = None) -> pd.DataFrame:
+        '''Lee una instantánea Arrow mapeándola en memoria y materializando solo las columnas pedidas
+        (por ejemplo ['Model', 'Amount', 'Date'] para calcular el balance).'''
+        import pyarrow as pa
+        # El archivo se mapea en memoria: solo se tocan las páginas de las columnas leídas #
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        if columns:
+            table = table.select(columns)
+        return table.to_pandas()
+
+    def load_arrow(self, path: str = None) -> pd.DataFrame:
+        '''Carga transacciones desde una instantánea Arrow (la más reciente si no se indica ruta).'''
+        files = [path] if path else glob.glob(os.path.join('data', 'data_*.arrow'))
+        try:
+            latest_file = max(files, key=os.path.getctime)
+            df = self.read_arrow(latest_file)
+            self.snapshot_path = latest_file
+            self._append_frame(df[COLUMNS])
+            return self.ERROR if self.errors.total else None
+        except (FileNotFoundError, ValueError) as e:
+            self.errors.add(e, f'Archivo no encontrado en ruta {files}')
+            return self.ERROR if self.errors.total else None
+
+    def load_snapshot(self) -> pd.DataFrame:
+        '''Carga la instantánea más reciente, sea Arrow o Excel.'''
+        files = glob.glob(os.path.join('data', 'data_*.arrow')) + glob.glob(os.path.join('data', 'data_*.xlsx'))
+        if files and max(files, key=os.path.getctime).endswith('.arrow'):
+            return self.load_arrow()
+        return self.load_excel()
+
+    def save_snapshot(self) -> str:
+        '''Guarda una instantánea en Arrow; si pyarrow no está instalado usa Excel.'''
+        try:
+            return self.save_arrow()
+        except ImportError:
+            return self.save_excel()
+
+    def _all_rows(self) -> pd.DataFrame:
+        '''Devuelve todas las transacciones del almacenamiento activo.'''
+        return self.storage.select() if self.storage is not None else self.df_transactions
+
+    def _append_frame(self, df: pd.DataFrame) -> None:
+        '''Añade un bloque de transacciones ya validadas al almacenamiento activo.'''
+        start = self.totals.rows
+        if self.storage is not None:
+            self.storage.insert_frame(df)
+        else:
+            # Se mantiene el orden: primero las filas sueltas, luego el bloque #
+            self._seal()
+            self._pending.append(df)
+        self._on_append(start, df)
+
+#########################################
+#Área de preparación de altas#
+#########################################
+
+    @property
+    def df_transactions(self) -> pd.DataFrame:
+        '''DataFrame de transacciones; antes de leerlo se unen las filas pendientes.'''
+        self.flush()
+        return self._df
+
+    @df_transactions.setter
+    def df_transactions(self, df: pd.DataFrame) -> None:
+        self._df = df
+
+    def _seal(self) -> None:
+        '''Convierte las filas sueltas preparadas en un bloque pendiente.'''
+        if self._staging['Model']:
+            self._pending.append(pd.DataFrame(self._staging, columns=COLUMNS))
+            self._staging = {col: [] for col in COLUMNS}
+
+    def flush(self) -> None:
+        '''Une todas las transacciones pendientes al DataFrame con una sola concatenación.'''
+        self._seal()
+        if self._pending:
+            blocks = self._align_blocks(self._pending)
+            self._df = self._apply_layout(pd.concat([self._df, *blocks], ignore_index=True))
+            self._pending = []
+
+    def _align_blocks(self, blocks: list) -> list:
+        '''Da a los bloques pendientes los tipos del DataFrame principal.
+        Si no, al concatenar las categóricas con categorías distintas pandas las convierte en
+        texto y _apply_layout vuelve a codificar el libro entero. Las categorías nuevas se
+        añaden antes a la columna principal: solo cambia la lista, no los códigos.'''
+        df = self._df
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                values = set().union(*(block[col].dropna().tolist() for block in blocks))
+                new = sorted(values.difference(df[col].cat.categories))
+                if new:
+                    df[col] = df[col].cat.add_categories(new)
+        dtypes = df.dtypes.to_dict()
+        return [pd.DataFrame({col: block[col] if block[col].dtype == dtype else block[col].astype(dtype)
+                              for col, dtype in dtypes.items()}) for block in blocks]
+
+    def _apply_layout(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''Devuelve el DataFrame con los tipos compactos de self.layout.
+        Al concatenar categóricas con categorías distintas pandas las convierte en texto.'''
+        changed = {col: dtype for col, dtype in self.layout.items() if df[col].dtype != dtype}
+        return df.astype(changed) if changed else df
+
+    def memory_report(self) -> dict:
+        '''Informa de los bytes usados por columna, en total y por fila.'''
+        usage = self.df_transactions.memory_usage(deep=True, index=False)
+        rows = len(self.df_transactions)
+        total = int(usage.sum())
+        return {
+            'rows': rows,
+            'total_bytes': total,
+            'bytes_per_row': total / rows if rows else 0.0,
+            'columns': {col: int(usage[col]) for col in usage.index}
+        }
+
+    def __len__(self) -> int:
+        '''Número de transacciones registradas.'''
+        if self.storage is not None:
+            return self.storage.count()
+        return len(self.df_transactions)
+
+#########################################
+#Agregados mantenidos incrementalmente#
+#########################################
+
+    def _row(self, index: int) -> dict:
+        '''Devuelve la transacción en la posición indicada como diccionario.'''
+        if self.storage is not None:
+            return self.storage.row(index)
+        return self.df_transactions.iloc[index].to_dict()
+
+    def _track(self, data: dict, sign: int) -> None:
+        '''Actualiza los agregados con una transacción añadida (1) o eliminada (-1).'''
+        self.totals.add(data['Model'], data['Amount'], sign)
+        date = data['Date']
+        if date is not None and not pd.isna(date):
+            key = (date.year, date.month)
+            self.period_versions[key] = self.period_versions.get(key, 0) + 1
+        # Con SQLite los resúmenes por periodo se resuelven en la base de datos #
+        if self.storage is None and data['Model'] == 'expense':
+            self.cube.add(data['Date'], data['Category'], data['Amount'], sign)
+
+    def _track_frame(self, df: pd.DataFrame, sign: int) -> None:
+        '''Actualiza los agregados con un bloque de transacciones.'''
+        self.totals.add_frame(df, sign)
+        dates = df['Date'].dropna()
+        for key in set(zip(dates.dt.year.tolist(), dates.dt.month.tolist())):
+            self.period_versions[key] = self.period_versions.get(key, 0) + 1
+        if self.storage is None:
+            self.cube.add_frame(df, sign)
+
+    def _on_insert(self, position: int, data: dict) -> None:
+        '''Actualiza agregados e índices tras añadir una transacción en la posición indicada.'''
+        self._track(data, 1)
+        if self.storage is None:
+            self.date_index.insert(position, data['Date'])
+            for column, index in self.text_index.items():
+                index.insert(position, data[column])
+
+    def _on_delete(self, position: int, old: dict) -> None:
+        '''Actualiza agregados e índices tras eliminar una transacción.'''
+        self._track(old, -1)
+        if self.storage is None:
+            self.date_index.delete(position)
+            for index in self.text_index.values():
+                index.delete(position)
+
+    def _on_update(self, position: int, old: dict, new: dict) -> None:
+        '''Actualiza agregados e índices tras editar una transacción.'''
+        self._track(old, -1)
+        self._track(new, 1)
+        if self.storage is None:
+            if old['Date'] != new['Date']:
+                self.date_index.update(position, new['Date'])
+            for column, index in self.text_index.items():
+                if old[column] != new[column]:
+                    index.update(position, new[column])
+
+    def _on_append(self, start: int, df: pd.DataFrame) -> None:
+        '''Actualiza agregados e índices tras añadir un bloque de transacciones.'''
+        self._track_frame(df, 1)
+        if self.storage is None:
+            self.date_index.extend(start, df['Date'])
+            for column, index in self.text_index.items():
+                index.extend(start, df[column])
+
+    def _recompute_totals(self) -> RunningTotals:
+        '''Recalcula los totales recorriendo todas las transacciones.'''
+        fresh = RunningTotals()
+        if self.storage is not None:
+            fresh.totals = {model: self.storage.sum_amount(model) for model in fresh.MODELS}
+            fresh.rows = self.storage.count()
+        else:
+            fresh.rebuild(self.df_transactions)
+        return fresh
+
+    def _rebuild(self) -> None:
+        '''Reconstruye todos los agregados desde cero.'''
+        # Todos los periodos pueden haber cambiado #
+        self._generation += 1
+        self.totals = self._recompute_totals()
+        if self.storage is None:
+            self.cube.rebuild(self.df_transactions)
+            self.date_index.rebuild(self.df_transactions['Date'])
+            for column, index in self.text_index.items():
+                index.rebuild(self.df_transactions[column])
+
+    def period_version(self, year: int, month: int = None) -> tuple:
+        '''Versión de los datos de un mes (o de todo un año si no se indica el mes).
+        Cambia cada vez que se añade, edita o elimina una transacción de ese periodo.'''
+        if month is not None:
+            return self._generation, self.period_versions.get((year, month), 0)
+        # Las versiones solo crecen: la suma cambia si cambia cualquier mes del año #
+        return self._generation, sum(self.period_versions.get((year, m), 0) for m in range(1, 13))
+
+    def verify_totals(self) -> bool:
+        '''Comprueba que los totales acumulados coinciden con un recálculo completo.'''
+        fresh = self._recompute_totals()
+        return self.totals.rows == fresh.rows and self.totals.matches(fresh.totals)
+
+#########################################
+#Diario de cambios y recuperación#
+#########################################
+
+    def _snapshot_header(self) -> dict:
+        '''Cabecera del diario que identifica la instantánea actual.'''
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            return {'op': 'base', 'snapshot': self.snapshot_path,
+                    'mtime': os.stat(self.snapshot_path).st_mtime_ns}
+        return {'op': 'base', 'snapshot': None, 'mtime': None}
+
+    def _log(self, record: dict) -> None:
+        '''Escribe un cambio en el diario y compacta si supera el tamaño máximo.'''
+        if self.journal is None or self._replaying:
+            return
+        self.journal.append(record)
+        if self.journal.size() > self.JOURNAL_MAX_BYTES:
+            self.compact()
+
+    def recover(self) -> pd.DataFrame:
+        '''Carga la última instantánea y reaplica los cambios del diario.'''
+        errors = self.load_snapshot()
+        if self.journal is None:
+            return errors
+        header = self.journal.header()
+        current = self._snapshot_header()
+        # Solo se reaplica si el diario corresponde a la instantánea cargada #
+        if header is not None and header == current:
+            self._replaying = True
+            try:
+                for record in self.journal.records():
+                    self._replay(record)
+            finally:
+                self._replaying = False
+        else:
+            self.journal.reset(current)
+        return self.ERROR if self.errors.total else None
+
+    def _replay(self, record: dict) -> None:
+        '''Aplica un registro del diario sobre las transacciones en memoria.'''
+        op = record.get('op')
+        if op == 'add':
+            row = record['row']
+            self.add_transaction(Transactions(row['Model'], row['Amount'], row['Category'],
+                                              row['Description'], row['Date']))
+        elif op == 'add_many':
+            self.add_transactions([TransactionRecord(row['Model'], row['Amount'], row['Category'],
+                                                     row['Description'], row['Date']) for row in record['rows']])
+        elif op == 'delete':
+            self.delete_transaction(record['index'])
+        elif op == 'edit':
+            self.edit_transaction(record['index'], **record['values'])
+
+    def sync_journal(self) -> None:
+        '''Asegura en disco el diario de cambios (no hace nada sin diario).'''
+        if self.journal is not None:
+            self.journal.sync()
+
+    def compact(self) -> str:
+        '''Guarda una instantánea y vacía el diario de cambios.'''
+        path = self.save_snapshot()
+        if self.journal is not None:
+            self.journal.reset(self._snapshot_header())
+        return path
+
 #########################################
 #Añadir transaccion,mostrar gastos#
 #########################################
@@ -87,101 +613,151 @@ class FinanceManager:
     def add_transaction(self, transaction: Transactions) -> None:
         '''Añade una nueva transacción a la lista.'''
         # Asegura que todas las columnas estén presentes en el diccionario
-        data = {col: getattr(transaction, col, None) for col in self.df_transactions.columns}
+        data = {col: getattr(transaction, col, None) for col in COLUMNS}
         # Si TODOS los valores son None, no agregues la fila (evita el warning)
         if all(v is None for v in data.values()):
             return
-        new_row = pd.DataFrame([data], columns=self.df_transactions.columns)
-        self.df_transactions = pd.concat([self.df_transactions, new_row], ignore_index=True)
+        position = self.totals.rows
+        if self.storage is not None:
+            # Inserción indexada en lugar de reescribir todo el libro #
+            self.storage.insert(data)
+        else:
+            # La fila queda en el área de preparación hasta la siguiente lectura #
+            for col in COLUMNS:
+                self._staging[col].append(data[col])
+            self._log({'op': 'add', 'row': self._journal_row(data)})
+        self._on_insert(position, data)
+
+    def add_transactions(self, transactions) -> int:
+        '''Añade un lote de transacciones (objetos Transactions o tuplas
+        (model, amount, category, description, date)) con una sola unión al DataFrame.
+        Retorna el número de transacciones añadidas.'''
+        rows = []
+        for item in transactions:
+            if isinstance(item, (tuple, list)):
+                # Misma validación que Transactions, sin un __dict__ por fila #
+                item = TransactionRecord(item[0], float(item[1]), *item[2:])
+            data = {col: getattr(item, col, None) for col in COLUMNS}
+            if not all(v is None for v in data.values()):
+                rows.append(data)
+        if not rows:
+            return 0
+        batch = pd.DataFrame(rows, columns=COLUMNS)
+        batch['Date'] = pd.to_datetime(batch['Date']).astype('datetime64[ns]')
+        self._append_frame(batch)
+        self._log({'op': 'add_many', 'rows': [self._journal_row(data) for data in rows]})
+        return len(rows)
+
+    def _journal_row(self, data: dict) -> dict:
+        '''Fila lista para el diario, con la fecha en DATE_FORMAT.'''
+        date = data['Date']
+        return {**data, 'Date': date.strftime(self.DATE_FORMAT) if pd.notna(date) else None}
 
     def total_balance(self) -> float:
         '''Calcula el balance total de las transacciones.'''
-        if self.df_transactions.empty:
+        if self.totals.rows == 0:
             return pd.DataFrame()
-        total_expenses = self.df_transactions.loc[self.df_transactions['Model'] == 'expense', 'Amount'].sum()
-        total_incomes = self.df_transactions.loc[self.df_transactions['Model'] == 'income', 'Amount'].sum()
-        return float(total_incomes - total_expenses)
+        if self.check_consistency and not self.verify_totals():
+            raise RuntimeError('Los totales acumulados no coinciden con el recálculo completo')
+        # Totales mantenidos en cada alta, edición o baja: no se recorre el libro #
+        return float(self.totals.balance())
     
+    def query(self) -> Query:
+        '''Consulta diferida sobre las transacciones: query().model(...).between(...).group_by(...).sum().'''
+        return Query(self)
+
     def expenses(self) -> tuple:
         '''Calcula los gastos totales por categoría agrupados por mes y año.'''
-        # Filtrando por gastos #
-        expenses = self.df_transactions[self.df_transactions['Model'] == 'expense'].copy()
+        query = self.query().model('expense')
+        expenses = query.rows()
         #Chequeo de gastos
         if expenses.empty:
             return expenses, pd.DataFrame()
-        # Columna Date nuevo indice para filtrado #
-        expenses.set_index('Date', inplace=True)
+        # Columna Date nuevo indice para filtrado (set_index no copia los datos con Copy-on-Write) #
+        expenses = expenses.set_index('Date')
         # Aun no tiene uso la tabla resumen pero muestra los gastos #
-        resumen = expenses.groupby(['Category'])['Amount'].sum().reset_index()
-        return expenses,resumen
+        return expenses, query.group_by('Category').sum()
               
     def monthly_expenses(self, year:str=None, month:str=None, daily:bool=False)-> tuple:
         '''Calcula los gastos mensuales por categoría o por día.'''
-        expenses,_ = self.expenses()
-         # Asegura que el índice es datetime parapruebas posteriores #
-        if not isinstance(expenses.index, pd.DatetimeIndex):
-            if 'Date' in expenses.columns:
-                expenses['Date'] = pd.to_datetime(expenses['Date'], errors='coerce')
-                expenses = expenses.set_index('Date')
         # Filtrando por año y mes introducidos por usuario o actuales # 
         try:
             year = int(year) if year else pd.Timestamp.now().year
             month = int(month) if month else pd.Timestamp.now().month
-            expenses = expenses[(expenses.index.year == year) & (expenses.index.month == month)]
         except (ValueError) as e:
             return 'invalid_date', pd.DataFrame()
-        if expenses.empty:
-            return 'no_data',expenses
-        # Si no se especifica que los gastos son diarios solo retornamos los gastos del mes por categorias#
+        if not 1 <= month <= 12:
+            return 'invalid_date', pd.DataFrame()
+        period = self._period(year, month, 1)
+        # Un año fuera de las fechas representables (20224, 3000) no tiene gastos #
+        if period is None:
+            return 'no_data', pd.DataFrame()
+        query = self.query().model('expense').between(*period)
         if not daily:
-            resumen = expenses.groupby(['Category'])['Amount'].sum().reset_index()
-            return 'ok', resumen
-        else:
-            #Creando tabla pivote para mostrar los datos diferente#
-            resumen = expenses.pivot_table(
-                index=expenses.index.day,   # cada día como fila
-                columns='Category',          # cada categoría como columna
-                values='Amount',
-                aggfunc='sum',
-                fill_value=0
-                ).reset_index()
-        return 'ok',resumen
+            resumen = query.group_by('Category').sum()
+            return ('no_data' if resumen.empty else 'ok'), resumen
+        resumen = query.group_by('day', 'Category').sum()
+        if resumen.empty:
+            return 'no_data', resumen
+        # Una columna por categoría y una fila por día #
+        resumen = resumen.pivot_table(index='Day', columns='Category', values='Amount',
+                                      aggfunc='sum', fill_value=0, observed=True)
+        resumen.index.name = 'Date'
+        return 'ok', resumen.reset_index()
     
     def anual_expenses(self, year:str=None, all_years:bool=False)-> tuple:
         '''Calcula los gastos anuales o los gastos de los ultimos 10 años.'''
-        expenses,_ = self.expenses()
-        # Asegura que el índice es datetime para pruebas posteriores #
-        if not isinstance(expenses.index, pd.DatetimeIndex):
-            if 'Date' in expenses.columns:
-                expenses['Date'] = pd.to_datetime(expenses['Date'], errors='coerce')
-                expenses = expenses.set_index('Date')
         try:
             year = int(year) if year else pd.Timestamp.now().year 
         except (ValueError) as e:
             return 'invalid_year', pd.DataFrame()
         
         if not all_years:
-            #Filtrando por el año seleccionado#
-            expenses = expenses[expenses.index.year == year]
-            expenses['Month'] = expenses.index.month
-            if expenses.empty:
-                return 'no_data', pd.Series()
-            
-            # Agrupar por mes y sumar
-            resumen = expenses.groupby('Month')['Amount'].sum()
-            return 'ok',resumen
+            # Agrupado por mes #
+            period, key = self._period(year, 1, 12), 'month'
+        else:
+            #Gastos de los 10 ultimos años#
+            period, key = self._period(pd.Timestamp.now().year - 9, 1, 120), 'year'
+        if period is None:
+            return 'no_data', pd.Series()
+        resumen = self.query().model('expense').between(*period).group_by(key).sum()
+        if resumen.empty:
+            return 'no_data', pd.Series()
+        column = resumen.columns[0]
+        return 'ok', resumen.set_index(column)['Amount']
+
+    @staticmethod
+    def _period(year: int, month: int, months: int) -> tuple:
+        '''Primer y último instante de months meses a partir de year-month, o None si el
+        periodo cae fuera de las fechas que pandas representa en nanosegundos.'''
+        try:
+            start = pd.Timestamp(year, month, 1).as_unit('ns')
+            end = (start + pd.DateOffset(months=months)).as_unit('ns') - pd.Timedelta(1, 'ns')
+        except (ValueError, OverflowError):
+            return None
+        return start, end
+
+    def expenses_by_category(self) -> pd.DataFrame:
+        '''Gastos totales por categoría sin recorrer las transacciones.'''
+        resumen = self.query().model('expense').group_by('Category').sum()
+        return resumen if not resumen.empty else pd.DataFrame()
+
+    def daily_expenses(self, start: str = None, end: str = None) -> pd.Series:
+        '''Gastos totales de cada día con gastos entre start y end (incluidos), indexados por fecha.'''
+        start = pd.Timestamp(start).normalize() if start else None
+        if end:
+            # Hasta el final del último día #
+            last_day = pd.Timestamp(end).normalize()
+            try:
+                end = last_day.as_unit('ns') + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+            except (ValueError, OverflowError):
+                # Fuera de las fechas en nanosegundos (año 3000) se cierra el día al segundo #
+                end = last_day.as_unit('s') + pd.Timedelta(days=1) - pd.Timedelta(1, 's')
         else:
-            actual_year = pd.Timestamp.now().year
-            #Filtrando gastos de los 10 ultimos años#
-            list_years = list(range(actual_year-9, actual_year + 1))
-            resumen = expenses[expenses.index.year.isin(list_years)]
-            if resumen.empty:
-                return 'no_data', pd.Series()
-            
-            # Agrupar por año y sumar
-            resumen['Years'] = resumen.index.year
-            resumen = resumen.groupby('Years')['Amount'].sum()
-            return 'ok',resumen
+            end = None
+        resumen = self.query().model('expense').between(start, end).group_by('date').sum()
+        return pd.Series(resumen['Amount'].to_numpy(dtype='float'),
+                         index=pd.DatetimeIndex(resumen['DayDate'], name='Date'), name='Amount')
 
 #########################################
         #Manejo de Errores#
@@ -200,11 +776,14 @@ class FinanceManager:
             df[date_column] = df[date_column].dt.strftime(self.DATE_FORMAT)
             return df 
          
+    @property
+    def ERROR(self) -> pd.DataFrame:
+        '''DataFrame con los errores registrados (se construye al pedirlo).'''
+        return self.errors.frame()
+
     def errors_register(self, e, message) -> pd.DataFrame:
-        '''Retorna los errores registrados'''
-        self.ERROR = pd.concat([self.ERROR, 
-                                    pd.DataFrame([{'Error': type(e).__name__, 'Message': message}])], 
-                                    ignore_index=True)
+        '''Registra un error y retorna los errores registrados'''
+        self.errors.add(e, message)
         return self.ERROR
 
 #########################################
@@ -214,69 +793,100 @@ class FinanceManager:
     def list_transactions(self, model_filter: str = None) -> pd.DataFrame:
         '''Devuelve las transacciones con sus índices visibles, opcionalmente filtradas por tipo.'''
         
-        if self.df_transactions.empty:
+        if len(self) == 0:
             return pd.DataFrame()
         
-        df_copy = self.df_transactions.copy()
-        df_copy.index.name = 'Index'
-        if model_filter in ['income', 'expense']:
-            df_copy = df_copy[df_copy['Model'] == model_filter]
-        
-        return df_copy.reset_index()
+        model = model_filter if model_filter in ['income', 'expense'] else None
+        if self.storage is not None:
+            df = self.storage.select(model=model)
+        elif model:
+            # Solo se copian las filas del tipo pedido #
+            df = self.df_transactions.take(self._model_positions(model))
+        else:
+            df = read_only_view(self.df_transactions)
+        return df.rename_axis('Index').reset_index()
     
     def delete_transaction(self, index: int) -> bool:
         '''Elimina una transacción por su índice. Retorna True si se eliminó, False si no.'''
-        if 0 <= index < len(self.df_transactions):
+        if not 0 <= index < len(self):
+            return False
+        old = self._row(index)
+        if self.storage is not None:
+            self.storage.delete(index)
+        else:
             self.df_transactions.drop(index=index, inplace=True)
             self.df_transactions.reset_index(drop=True, inplace=True)
-            return True
-        return False
+            self._log({'op': 'delete', 'index': index})
+        self._on_delete(index, old)
+        return True
     
     def edit_transaction(self, index: int, **kwargs) -> bool:
         '''Edita una transacción por su índice. kwargs pueden ser columnas nuevas.'''
-        if 0 <= index < len(self.df_transactions):
-            for key, value in kwargs.items():
-                if key in self.df_transactions.columns:
-                    if key == 'Date':
-                        try:
-                            value = pd.to_datetime(value, format=self.DATE_FORMAT)
-                        except ValueError:
-                            continue  # Ignora si la fecha es inválida
-                    self.df_transactions.at[index, key] = value
-                else:
-                    return False               
-            return True
+        if 0 <= index < len(self):
+            values = {key: value.strftime(self.DATE_FORMAT) if hasattr(value, 'strftime') else value
+                      for key, value in kwargs.items()}
+            old = self._row(index)
+            try:
+                for key, value in kwargs.items():
+                    if key in COLUMNS:
+                        if key == 'Date':
+                            try:
+                                value = pd.to_datetime(value, format=self.DATE_FORMAT)
+                            except ValueError:
+                                continue  # Ignora si la fecha es inválida
+                        if self.storage is not None:
+                            self.storage.update(index, key, value)
+                        else:
+                            self._ensure_category(key, value)
+                            self.df_transactions.at[index, key] = value
+                    else:
+                        return False               
+                return True
+            finally:
+                # Se descuenta la fila original y se suma la editada #
+                self._on_update(index, old, self._row(index))
+                # Se anota con el cambio ya aplicado: si el diario se compacta, la instantánea lo incluye #
+                self._log({'op': 'edit', 'index': index, 'values': values})
         return False
     
+    def _ensure_category(self, column: str, value) -> None:
+        '''Añade el valor a las categorías de una columna categórica si aún no existe.'''
+        series = self.df_transactions[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) and pd.notna(value) and value not in series.cat.categories:
+            self.df_transactions[column] = series.cat.add_categories([value])
+
     def search_transactions(self, model: str = None, 
                             category: str = None,
                             description: str = None,
                             start_date: str = None,
                             end_date: str = None) -> pd.DataFrame:
         '''Busca transacciones por modelo, categoría, descripción y rango de fechas.'''
-        if self.df_transactions.empty:
+        if len(self) == 0:
             return pd.DataFrame()
-        
-        df = self.df_transactions.copy()
-
-        if model:
-            df = df[df['Model'].str.lower() == model.lower()]
-        if category:
-            df = df[df['Category'].str.lower().str.contains(category.lower())]
-        if description:
-            df = df[df['Description'].str.lower().str.contains(description.lower())]
+        start = end = None
         if start_date:
             try:
-                start_date = pd.to_datetime(start_date, format=self.DATE_FORMAT)
-                df = df[df['Date'] >= start_date]
+                start = pd.to_datetime(start_date, format=self.DATE_FORMAT)
             except ValueError:
                 return pd.DataFrame()
         if end_date:
             try:
-                end_date = pd.to_datetime(end_date, format=self.DATE_FORMAT)
-                df = df[df['Date'] <= end_date]
+                end = pd.to_datetime(end_date, format=self.DATE_FORMAT)
             except ValueError:
                 pass
-        return df
-    
-            
\ No newline at end of file
+        # Los filtros se resuelven con los índices (o en SQLite) y las filas se copian una sola vez #
+        return (self.query().model(model).between(start, end)
+                .category(category).description(description).rows())
+
+    def _model_positions(self, model: str, positions: np.ndarray = None) -> np.ndarray:
+        '''Posiciones de las transacciones de un tipo (sin distinguir mayúsculas),
+        limitadas a positions si se indican. Con Model categórica se comparan los códigos.'''
+        column = self.df_transactions['Model']
+        if positions is not None:
+            column = column.iloc[positions]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            wanted = np.flatnonzero(column.cat.categories.str.lower() == model.lower())
+            matches = np.isin(column.cat.codes.to_numpy(), wanted)
+        else:
+            matches = (column.str.lower() == model.lower()).to_numpy()
+        return positions[matches] if positions is not None else np.flatnonzero(matches)
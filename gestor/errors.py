@@ -0,0 +1,59 @@
+from collections import Counter
+import pandas as pd
+
+
+class ErrorCollector:
+    ''' Registro acotado de los errores de carga de un gestor.
+    Los errores se añaden a una lista (sin concatenar DataFrames en cada uno) y solo se
+    guardan los primeros max_entries; a partir de ahí se siguen contando por tipo. El
+    DataFrame se construye únicamente cuando se pide.
+    Atributos:
+        COLUMNS (list): Columnas del DataFrame de errores.
+        max_entries (int): Errores que se guardan como máximo.
+        counts (Counter): Número de errores por tipo, incluidos los no guardados.
+        total (int): Número de errores registrados, incluidos los no guardados.
+    Métodos:
+        add: Registra un error.
+        extend: Registra varios errores (tuplas tipo, mensaje[, fila, columna]).
+        frame: DataFrame con los errores guardados.
+        clear: Borra los errores.
+    '''
+    COLUMNS = ['Error', 'Message', 'Row', 'Column']
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self.total = 0
+        self._entries = []
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def dropped(self) -> int:
+        '''Errores contados pero no guardados por superar max_entries.'''
+        return self.total - len(self._entries)
+
+    def add(self, error, message: str, row: int = None, column: str = None) -> None:
+        '''Registra un error; error puede ser la excepción o el nombre de su tipo.'''
+        name = error if isinstance(error, str) else type(error).__name__
+        self.counts[name] += 1
+        self.total += 1
+        if len(self._entries) < self.max_entries:
+            self._entries.append((name, message, row, column))
+
+    def extend(self, errors) -> None:
+        '''Registra varios errores de una vez.'''
+        for error in errors:
+            self.add(*error)
+
+    def frame(self, since: int = 0) -> pd.DataFrame:
+        '''DataFrame con los errores guardados desde la posición since (ver len()).'''
+        df = pd.DataFrame(self._entries[since:], columns=self.COLUMNS)
+        return df.astype({'Row': 'Int64'})
+
+    def clear(self) -> None:
+        '''Borra los errores y los contadores.'''
+        self.counts.clear()
+        self.total = 0
+        self._entries = []
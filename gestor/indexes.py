@@ -0,0 +1,295 @@
+import bisect
+import itertools
+import numpy as np
+import pandas as pd
+
+
+class DateIndex:
+    ''' Índice lateral de las transacciones ordenado por fecha.
+    Guarda las fechas (en nanosegundos) ordenadas junto con la posición de cada fila
+    en el DataFrame, de modo que un rango de fechas se resuelve por búsqueda binaria
+    como un corte del índice en lugar de recorrer toda la columna Date.
+    Las filas sin fecha no se indexan porque nunca cumplen un filtro por fechas.
+    Métodos:
+        rebuild: Reconstruye el índice a partir de la columna Date.
+        extend: Añade un bloque de filas al final del DataFrame.
+        insert: Añade una fila nueva al final del DataFrame.
+        delete: Quita una fila y desplaza las posiciones siguientes.
+        update: Cambia la fecha de una fila.
+        range: Posiciones (en orden de fila) cuyas fechas están en [start, end].
+    '''
+
+    def __init__(self):
+        self._dates = np.empty(0, dtype='int64')
+        self._positions = np.empty(0, dtype='int64')
+        self._size = 0
+
+    @staticmethod
+    def _ns(date) -> int:
+        '''Convierte una fecha a nanosegundos o None si no hay fecha.
+        Las fechas fuera del rango en nanosegundos se llevan al extremo más cercano, de modo
+        que un rango que empieza en el año 3000 queda vacío y uno que termina ahí queda abierto.'''
+        if date is None or pd.isna(date):
+            return None
+        date = pd.Timestamp(date)
+        try:
+            return date.as_unit('ns').value
+        except (OverflowError, ValueError):
+            limits = np.iinfo('int64')
+            return limits.max if date > pd.Timestamp.max else limits.min
+
+    def _reserve(self, extra: int) -> None:
+        '''Amplía la capacidad duplicándola para que añadir filas sea O(1) amortizado.'''
+        needed = self._size + extra
+        if needed <= len(self._dates):
+            return
+        capacity = max(needed, 2 * len(self._dates), 16)
+        for name in ('_dates', '_positions'):
+            grown = np.empty(capacity, dtype='int64')
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+
+    def rebuild(self, dates: pd.Series) -> None:
+        '''Reconstruye el índice a partir de la columna Date completa.'''
+        self._size = 0
+        self.extend(0, dates)
+
+    def extend(self, start: int, dates: pd.Series) -> None:
+        '''Añade un bloque de filas cuyas posiciones empiezan en start.'''
+        values = pd.to_datetime(dates).astype('datetime64[ns]')
+        valid = values.notna().to_numpy()
+        new_dates = values.to_numpy()[valid].astype('int64')
+        new_positions = np.arange(start, start + len(values), dtype='int64')[valid]
+        self._reserve(len(new_dates))
+        size = self._size
+        self._dates[size:size + len(new_dates)] = new_dates
+        self._positions[size:size + len(new_dates)] = new_positions
+        self._size += len(new_dates)
+        # Solo se reordena si el bloque no llega ya ordenado tras la última fecha #
+        merged = self._dates[:self._size]
+        if len(new_dates) and (np.any(np.diff(new_dates) < 0) or (size and new_dates[0] < merged[size - 1])):
+            order = np.argsort(merged, kind='stable')
+            self._dates[:self._size] = merged[order]
+            self._positions[:self._size] = self._positions[:self._size][order]
+
+    def _place(self, position: int, value: int) -> None:
+        '''Inserta una entrada manteniendo el orden por fecha.'''
+        self._reserve(1)
+        size = self._size
+        i = int(np.searchsorted(self._dates[:size], value, side='right'))
+        self._dates[i + 1:size + 1] = self._dates[i:size]
+        self._positions[i + 1:size + 1] = self._positions[i:size]
+        self._dates[i] = value
+        self._positions[i] = position
+        self._size += 1
+
+    def _drop(self, position: int) -> None:
+        '''Quita la entrada de una posición sin tocar las demás.'''
+        size = self._size
+        found = np.flatnonzero(self._positions[:size] == position)
+        if len(found):
+            i = int(found[0])
+            self._dates[i:size - 1] = self._dates[i + 1:size]
+            self._positions[i:size - 1] = self._positions[i + 1:size]
+            self._size -= 1
+
+    def insert(self, position: int, date) -> None:
+        '''Añade una fila nueva (al final del DataFrame) con su fecha.'''
+        value = self._ns(date)
+        if value is not None:
+            self._place(position, value)
+
+    def delete(self, position: int) -> None:
+        '''Quita una fila y desplaza las posiciones posteriores como hace reset_index.'''
+        self._drop(position)
+        positions = self._positions[:self._size]
+        positions[positions > position] -= 1
+
+    def update(self, position: int, date) -> None:
+        '''Cambia la fecha de una fila existente.'''
+        self._drop(position)
+        self.insert(position, date)
+
+    def range(self, start=None, end=None) -> np.ndarray:
+        '''Posiciones cuyas fechas están en [start, end], en orden de fila.'''
+        dates = self._dates[:self._size]
+        lo = int(np.searchsorted(dates, self._ns(start), side='left')) if start is not None else 0
+        hi = int(np.searchsorted(dates, self._ns(end), side='right')) if end is not None else self._size
+        return np.sort(self._positions[lo:hi])
+
+
+class TextIndex:
+    ''' Índice invertido de una columna de texto para búsquedas por subcadena.
+    Cada valor distinto (en minúsculas) recibe un código y guarda la lista ordenada de
+    las filas que lo tienen. En la primera búsqueda los valores distintos se parten en
+    palabras: cada palabra guarda los valores que la contienen y las palabras tienen un
+    índice de trigramas. Una búsqueda localiza las palabras que contienen cada término,
+    de ahí los valores y une sus listas de filas, así que su costo depende de cuántas
+    filas coinciden y no del tamaño del libro.
+    Para que borrar no obligue a renumerar todas las listas, estas guardan la posición
+    original de cada fila; las posiciones borradas se anotan aparte y se descuentan al
+    devolver el resultado.
+    Métodos:
+        rebuild: Reconstruye el índice a partir de una columna.
+        extend: Añade un bloque de filas al final del DataFrame.
+        insert: Añade una fila nueva al final del DataFrame.
+        delete: Quita una fila y desplaza las posiciones siguientes.
+        update: Cambia el texto de una fila.
+        search: Posiciones (en orden de fila) cuyo texto contiene la subcadena.
+    '''
+
+    def __init__(self):
+        self._vocab = {}
+        self._values = []
+        self._rows = []
+        self._codes = np.empty(0, dtype='int64')
+        self._size = 0
+        # Posiciones originales borradas, ordenadas #
+        self._deleted = np.empty(0, dtype='int64')
+        # Índice de palabras (se completa al buscar): palabra -> id, trigrama -> ids, id -> valores #
+        self._word_ids = {}
+        self._words = []
+        self._trigrams = {}
+        self._word_values = []
+        self._short_words = set()
+        self._indexed = 0
+
+    def _code(self, value) -> int:
+        '''Código del valor (en minúsculas); -1 si no hay texto.'''
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return -1
+        value = str(value).lower()
+        code = self._vocab.get(value)
+        if code is None:
+            code = len(self._values)
+            self._vocab[value] = code
+            self._values.append(value)
+            self._rows.append([])
+        return code
+
+    def _reserve(self, extra: int) -> None:
+        '''Amplía la capacidad del arreglo de códigos duplicándola.'''
+        needed = self._size + extra
+        if needed > len(self._codes):
+            grown = np.empty(max(needed, 2 * len(self._codes), 16), dtype='int64')
+            grown[:self._size] = self._codes[:self._size]
+            self._codes = grown
+
+    def _original(self, position: int) -> int:
+        '''Posición original (la que guardan las listas) de la fila en la posición actual.'''
+        shifted = self._deleted - np.arange(len(self._deleted))
+        return position + int(np.searchsorted(shifted, position, side='right'))
+
+    def rebuild(self, values: pd.Series) -> None:
+        '''Reconstruye el índice a partir de una columna completa.'''
+        self._size = 0
+        self._deleted = np.empty(0, dtype='int64')
+        self._rows = [[] for _ in self._values]
+        self.extend(0, values)
+
+    def extend(self, start: int, values: pd.Series) -> None:
+        '''Añade un bloque de filas; solo se procesa cada valor distinto una vez.'''
+        factor, uniques = pd.factorize(pd.Series(values, dtype='object'))
+        mapping = np.array([self._code(value) for value in uniques] + [-1], dtype='int64')
+        codes = mapping[factor]
+        # Las filas del bloque se agrupan por valor y se añaden a cada lista ya ordenadas #
+        order = np.argsort(codes, kind='stable')
+        grouped = codes[order]
+        touched = np.unique(mapping[:-1])
+        bounds = zip(touched.tolist(), np.searchsorted(grouped, touched, side='left').tolist(),
+                     np.searchsorted(grouped, touched, side='right').tolist())
+        positions = (order + self._size + len(self._deleted)).tolist()
+        for code, lo, hi in bounds:
+            self._rows[code].extend(positions[lo:hi])
+        self._reserve(len(codes))
+        self._codes[self._size:self._size + len(codes)] = codes
+        self._size += len(codes)
+
+    def insert(self, position: int, value) -> None:
+        '''Añade una fila nueva (al final del DataFrame) con su texto.'''
+        code = self._code(value)
+        if code >= 0:
+            self._rows[code].append(self._size + len(self._deleted))
+        self._reserve(1)
+        self._codes[self._size] = code
+        self._size += 1
+
+    def _unlink(self, code: int, original: int) -> None:
+        '''Quita una posición original de la lista de un valor.'''
+        if code >= 0:
+            rows = self._rows[code]
+            del rows[bisect.bisect_left(rows, original)]
+
+    def delete(self, position: int) -> None:
+        '''Quita una fila; las siguientes se desplazan al descontar la posición borrada.'''
+        original = self._original(position)
+        self._unlink(int(self._codes[position]), original)
+        self._deleted = np.insert(self._deleted, np.searchsorted(self._deleted, original), original)
+        self._codes[position:self._size - 1] = self._codes[position + 1:self._size]
+        self._size -= 1
+
+    def update(self, position: int, value) -> None:
+        '''Cambia el texto de una fila existente.'''
+        old, new = int(self._codes[position]), self._code(value)
+        if old == new:
+            return
+        original = self._original(position)
+        self._unlink(old, original)
+        if new >= 0:
+            bisect.insort(self._rows[new], original)
+        self._codes[position] = new
+
+    def _word_id(self, word: str) -> int:
+        '''Id de la palabra; las nuevas se añaden al índice de trigramas.'''
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            self._word_values.append([])
+            if len(word) < 3:
+                self._short_words.add(word_id)
+            for i in range(len(word) - 2):
+                self._trigrams.setdefault(word[i:i + 3], set()).add(word_id)
+        return word_id
+
+    def _index_words(self) -> None:
+        '''Parte en palabras los valores distintos que aún no lo están.'''
+        for code in range(self._indexed, len(self._values)):
+            for word in set(self._values[code].split()):
+                self._word_values[self._word_id(word)].append(code)
+        self._indexed = len(self._values)
+
+    def _matching_words(self, term: str) -> list:
+        '''Ids de las palabras que contienen el término.'''
+        if len(term) < 3:
+            # Las palabras de 3 letras o más que lo contienen tienen un trigrama que lo contiene #
+            sets = [ids for trigram, ids in self._trigrams.items() if term in trigram]
+            candidates = self._short_words.union(*sets)
+        else:
+            sets = sorted((self._trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)), key=len)
+            candidates = sets[0].intersection(*sets[1:])
+        return [word_id for word_id in candidates if term in self._words[word_id]]
+
+    def _matching_values(self, text: str):
+        '''Códigos de los valores distintos que contienen la subcadena.'''
+        terms = text.split()
+        if not terms:
+            return [code for code, value in enumerate(self._values) if text in value]
+        # Un valor que contiene el texto tiene, para cada término, una palabra que lo contiene:
+        # se usa el término con menos valores y el resto se comprueba sobre ese resultado #
+        lists = min(([self._word_values[word_id] for word_id in self._matching_words(term)] for term in terms),
+                    key=lambda lists: sum(map(len, lists)))
+        codes = lists[0] if len(lists) == 1 else set(itertools.chain.from_iterable(lists))
+        if terms != [text]:
+            return [code for code in codes if text in self._values[code]]
+        return codes
+
+    def search(self, text: str) -> np.ndarray:
+        '''Posiciones (en orden de fila) cuyo texto contiene la subcadena, sin distinguir mayúsculas.'''
+        self._index_words()
+        rows = itertools.chain.from_iterable(self._rows[code] for code in self._matching_values(text.lower()))
+        positions = np.sort(np.fromiter(rows, dtype='int64'))
+        if len(self._deleted):
+            positions -= np.searchsorted(self._deleted, positions)
+        return positions
@@ -0,0 +1,182 @@
+import contextlib
+import cProfile
+import functools
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+logger = logging.getLogger('gestor')
+
+
+def _io_counters() -> tuple:
+    '''Bytes leídos y escritos por el proceso (Linux); (None, None) si no se pueden leer.'''
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            fields = dict(line.split(b':') for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _rows(result) -> int:
+    '''Filas que devuelve o toca una llamada, según el tipo de resultado.'''
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], (pd.DataFrame, pd.Series)):
+        result = result[1] # (estado, resumen) de los informes #
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, int):
+        return result
+    return 0
+
+
+class Instrumentation:
+    ''' Medición opcional de los métodos públicos de FinanceManager y Graphs.
+    Al activarla se envuelven los métodos públicos de las clases y cada llamada registra
+    su duración en un histograma, las filas que devuelve o toca y los bytes leídos y
+    escritos por el proceso. Al desactivarla se restauran los métodos originales, así
+    que sin activar no hay ningún costo.
+    Atributos:
+        BUCKETS_MS (tuple): Límites superiores (ms) de los tramos del histograma.
+        log_interval (float): Segundos entre líneas de resumen en el log (None para no escribir).
+        track_io (bool): Si es True se miden los bytes leídos y escritos en cada llamada.
+        stats (dict): Estadísticas acumuladas por método.
+    Métodos:
+        enable: Envuelve los métodos públicos de las clases indicadas.
+        disable: Restaura los métodos originales.
+        snapshot: Copia de las estadísticas actuales.
+        log_line: Resumen de una línea de las estadísticas.
+        reset: Borra las estadísticas.
+    '''
+    BUCKETS_MS = (0.1, 1, 10, 100, 1000, 10000)
+
+    def __init__(self, log_interval: float = 60.0, track_io: bool = True):
+        self.log_interval = log_interval
+        self.track_io = track_io and _io_counters()[0] is not None
+        self.stats = {}
+        self._originals = []
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self, *classes) -> 'Instrumentation':
+        '''Envuelve los métodos públicos de las clases (por defecto FinanceManager y Graphs).'''
+        if self.enabled:
+            return self
+        if not classes:
+            from gestor.core import FinanceManager
+            from gestor.visualizations import Graphs
+            classes = (FinanceManager, Graphs)
+        for cls in classes:
+            for name, attribute in list(vars(cls).items()):
+                if name.startswith('_'):
+                    continue
+                if isinstance(attribute, (staticmethod, classmethod)):
+                    wrapped = type(attribute)(self._wrap(f'{cls.__name__}.{name}', attribute.__func__))
+                elif callable(attribute) and not isinstance(attribute, type):
+                    wrapped = self._wrap(f'{cls.__name__}.{name}', attribute)
+                else:
+                    continue # propiedades, constantes y clases internas #
+                self._originals.append((cls, name, attribute))
+                setattr(cls, name, wrapped)
+        return self
+
+    def disable(self) -> None:
+        '''Restaura los métodos originales.'''
+        for cls, name, attribute in reversed(self._originals):
+            setattr(cls, name, attribute)
+        self._originals = []
+
+    def _wrap(self, name: str, func):
+        '''Envoltorio que mide una llamada y la registra.'''
+        instrumentation = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            read, written = _io_counters() if instrumentation.track_io else (None, None)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                after = _io_counters() if read is not None else (None, None)
+            instrumentation.record(name, elapsed, _rows(result),
+                                   after[0] - read if read is not None else 0,
+                                   after[1] - written if written is not None else 0)
+            return result
+        return wrapper
+
+    def record(self, name: str, seconds: float, rows: int = 0, bytes_read: int = 0, bytes_written: int = 0) -> None:
+        '''Suma una llamada a las estadísticas del método.'''
+        ms = seconds * 1000
+        with self._lock:
+            entry = self.stats.get(name)
+            if entry is None:
+                entry = self.stats[name] = {'calls': 0, 'total_s': 0.0, 'max_ms': 0.0, 'rows': 0,
+                                            'bytes_read': 0, 'bytes_written': 0,
+                                            'histogram': [0] * (len(self.BUCKETS_MS) + 1)}
+            entry['calls'] += 1
+            entry['total_s'] += seconds
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['rows'] += rows
+            entry['bytes_read'] += bytes_read
+            entry['bytes_written'] += bytes_written
+            bucket = next((i for i, limit in enumerate(self.BUCKETS_MS) if ms <= limit), len(self.BUCKETS_MS))
+            entry['histogram'][bucket] += 1
+            due = self.log_interval is not None and time.monotonic() - self._last_log >= self.log_interval
+            if due:
+                self._last_log = time.monotonic()
+        if due:
+            logger.info(self.log_line())
+
+    def snapshot(self) -> dict:
+        '''Copia de las estadísticas con la media y el histograma etiquetado por tramos.'''
+        labels = [f'<={limit}ms' for limit in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}ms']
+        with self._lock:
+            return {name: {**{key: value for key, value in entry.items() if key != 'histogram'},
+                           'mean_ms': entry['total_s'] * 1000 / entry['calls'],
+                           'histogram': dict(zip(labels, entry['histogram']))}
+                    for name, entry in self.stats.items()}
+
+    def log_line(self) -> str:
+        '''Resumen de una línea: los métodos con más tiempo acumulado.'''
+        snapshot = sorted(self.snapshot().items(), key=lambda item: item[1]['total_s'], reverse=True)
+        parts = [f"{name} n={entry['calls']} total={entry['total_s'] * 1000:.1f}ms "
+                 f"max={entry['max_ms']:.1f}ms filas={entry['rows']}" for name, entry in snapshot[:5]]
+        return 'estadísticas: ' + ('; '.join(parts) if parts else 'sin llamadas')
+
+    def reset(self) -> None:
+        '''Borra las estadísticas acumuladas.'''
+        with self._lock:
+            self.stats = {}
+
+
+@contextlib.contextmanager
+def profile(out=None, sort: str = 'cumulative', limit: int = 25, memory: bool = True):
+    '''Perfila el bloque con cProfile y, si memory es True, con tracemalloc.
+    Al terminar escribe las funciones más costosas y las líneas que más memoria reservaron.'''
+    out = out or sys.stderr
+    profiler = cProfile.Profile()
+    if memory:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            out.write(f'Memoria: actual {current / 1e6:.1f} MB, pico {peak / 1e6:.1f} MB\n')
+            for stat in snapshot.statistics('lineno')[:10]:
+                out.write(f'{stat}\n')
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+
+
+def _to_json(value):
+    '''Convierte tipos de numpy/pandas a tipos nativos serializables.'''
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class Journal:
+    ''' Diario de cambios de solo anexado (write-ahead log).
+    Cada operación (alta, edición o baja) se escribe como una línea JSON y se pasa
+    al sistema operativo antes de continuar, de modo que no hace falta reescribir
+    el archivo Excel completo tras cada cambio. El fsync (lo lento) no se hace por
+    registro: sync lo hace una vez para todos los pendientes y puede llamarse desde
+    otro hilo; close y reset también sincronizan.
+    La primera línea es una cabecera que identifica la instantánea (snapshot)
+    sobre la que se aplican los cambios.
+    Atributos:
+        path (str): Ruta del archivo del diario.
+    Métodos:
+        append: Añade un registro y lo pasa al sistema operativo.
+        sync: Sincroniza a disco los registros escritos.
+        header: Devuelve la cabecera del diario.
+        records: Devuelve los registros de cambios posteriores a la cabecera.
+        reset: Vacía el diario dejando solo una nueva cabecera.
+        size: Tamaño actual del diario en bytes.
+        close: Cierra el archivo.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        # sync puede correr en otro hilo: no debe coincidir con el cambio de archivo de reset #
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        '''Añade un registro al final del diario y lo pasa al sistema operativo (sin fsync).'''
+        self._file.write(json.dumps(record, ensure_ascii=False, default=_to_json) + '\n')
+        self._file.flush()
+
+    def sync(self) -> None:
+        '''Sincroniza a disco todo lo escrito; un solo fsync para todos los registros pendientes.'''
+        with self._lock:
+            if not self._file.closed:
+                os.fsync(self._file.fileno())
+
+    def _read(self) -> list:
+        '''Lee todas las líneas válidas del diario.'''
+        entries = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Una última línea incompleta indica una escritura interrumpida #
+                    break
+        return entries
+
+    def header(self) -> dict:
+        '''Devuelve la cabecera del diario o None si está vacío.'''
+        entries = self._read()
+        if entries and entries[0].get('op') == 'base':
+            return entries[0]
+        return None
+
+    def records(self) -> list:
+        '''Devuelve los registros de cambios (sin la cabecera).'''
+        return [entry for entry in self._read() if entry.get('op') != 'base']
+
+    def reset(self, header: dict) -> None:
+        '''Reemplaza el diario por uno vacío con la cabecera indicada.'''
+        with self._lock:
+            self._file.close()
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            # Reemplazo atómico para no perder el diario si se interrumpe #
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def size(self) -> int:
+        '''Tamaño actual del diario en bytes.'''
+        return os.path.getsize(self.path)
+
+    def close(self) -> None:
+        '''Sincroniza y cierra el archivo del diario.'''
+        self.sync()
+        with self._lock:
+            self._file.close()
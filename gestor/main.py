@@ -1,13 +1,77 @@
+import time
+START = time.perf_counter()
+import sys
+import threading
+import asyncio
 from transactions import Transactions
 from core import FinanceManager
+# visualizations no importa matplotlib ni seaborn hasta pedir el primer gráfico #
 from visualizations import Graphs
+from autosave import AutoSaver
+from instrumentation import Instrumentation
+import logging
 import pandas as pd
+import os
+
+##Modo por comandos: una operación (o un archivo de operaciones) sin menú##
+INTERACTIVE_FLAGS = ('--timing', '--stats')
+if __name__ == '__main__' and any(arg not in INTERACTIVE_FLAGS for arg in sys.argv[1:]):
+    import cli
+    sys.exit(cli.main(sys.argv[1:]))
+
+TIMING = '--timing' in sys.argv
+TIMINGS = {'imports': time.perf_counter() - START}
+
+##Con --stats se mide cada método y se escribe un resumen en stderr cada STATS_INTERVAL segundos##
+STATS_INTERVAL = 60.0
+instrumentation = None
+if '--stats' in sys.argv:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    instrumentation = Instrumentation(log_interval=STATS_INTERVAL).enable(FinanceManager, Graphs)
 
 #Iniciando instancias#
-manager= FinanceManager()
+manager= FinanceManager(journal_path=os.path.join('data', 'journal.jsonl'))
 graphs = Graphs(manager)
-##Cargando Archivo CSV##
-ERROR=manager.load_excel()
+##El diario se sincroniza en segundo plano tras AUTOSAVE_DELAY segundos sin cambios; se compacta al salir##
+AUTOSAVE_DELAY = 2.0
+saver = AutoSaver(manager, delay=AUTOSAVE_DELAY)
+
+def load_data():
+    '''Carga la última instantánea y reaplica el diario de cambios en segundo plano.'''
+    started = time.perf_counter()
+    manager.recover()
+    TIMINGS['data_load'] = time.perf_counter() - started
+
+##Los datos se cargan mientras se muestra el menú##
+loader = threading.Thread(target=load_data, daemon=True)
+loader.start()
+
+def timing_report():
+    '''Muestra cuánto tarda cada fase del arranque.'''
+    loader.join()
+    print("\n=== Tiempos de arranque ===")
+    print(f"Importaciones: {TIMINGS['imports'] * 1000:.1f} ms")
+    print(f"Menú disponible: {TIMINGS['menu'] * 1000:.1f} ms")
+    print(f"Carga de datos (en segundo plano): {TIMINGS['data_load'] * 1000:.1f} ms")
+    print(f"Total hasta tener los datos: {(time.perf_counter() - START) * 1000:.1f} ms")
+    print(f"matplotlib cargado: {'sí' if 'matplotlib' in sys.modules else 'no'}")
+
+async def ainput(prompt: str = '') -> str:
+    '''input() en un hilo aparte para no bloquear el bucle de asyncio.
+    El hilo es daemon: al salir con Ctrl-C no se espera a que el usuario pulse Enter.'''
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def read():
+        try:
+            result = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(lambda error=e: future.done() or future.set_exception(error))
+        else:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(result))
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
 
 def menu():
     print("\n=== Gestor de Gastos ===")
@@ -21,322 +85,364 @@ def menu():
     print("8. Filtrar Transacciones")
     print("9. Guardar y salir")
 
-while True:
-    menu()
-    choice = input("Seleccione una opción: ")
-    if choice not in ['1', '2', '3', '4', '5', '6','7','8','9']:
-        print("\nOpción no válida. Por favor, seleccione una opción válida.")
-        continue 
-
-    if choice == '1':   ##Agregar ingreso##
-        try:
-            Amount = abs(float(input("Ingrese el monto del ingreso: ")))       
-            Category = input("Ingrese la categoría del ingreso: ")
-            if not Category.strip():
-                Category = "Correcciones"
-            Description = input("Ingrese una descripción del ingreso: ")
-            Date = input("Ingrese una fecha (dd-mm-YYYY HH:MM:SS) o deje en blanco para usar la fecha actual: ")
-            transaction = Transactions('income', Amount, Category, Description, Date)
-            manager.add_transaction(transaction)
-            print("\nIngreso agregado exitosamente.")
-        except ValueError:
-            print(f"Valor incorrecto, por favor ingrese un número válido para el monto.")
-        # Guardar los cambios en el archivo Excel#
-        manager.save_excel()
-
-    elif choice == '2': ##Agregar gasto##
-        try:
-            Amount = abs(float(input("Ingrese el monto del gasto: ")))
-            Category = input("Ingrese la categoría del gasto: ")
-            if not Category.strip():
-                Category = "Correcciones"
-            Description = input("Ingrese una descripción del gasto: ")
-            Date = input("Ingrese una fecha (dd-mm-YYYY HH:MM:SS) o deje en blanco para usar la fecha actual: ")
-            transaction = Transactions('expense', Amount, Category, Description, Date)
-            manager.add_transaction(transaction)
-            print("\nGasto agregado exitosamente.")
-        except ValueError:
-            print(f"Valor incorrecto, por favor ingrese un número válido para el monto.")
-        # Guardar los cambios en el archivo Excel#
-        manager.save_excel()
-
-    elif choice == '3': ##Ver balance total##
-        total = manager.total_balance()
-        print(f"\nEl balance total es: {total:.2f}")
+async def run():
+    '''Bucle del menú: las entradas se leen sin bloquear el bucle de asyncio, así el
+    guardado automático se hace mientras el usuario escribe.'''
+    try:
+        while True:
+            menu()
+            if 'menu' not in TIMINGS:
+                TIMINGS['menu'] = time.perf_counter() - START
+                if TIMING:
+                    timing_report()
+                    break
+            choice = await ainput("Seleccione una opción: ")
+            if choice not in ['1', '2', '3', '4', '5', '6','7','8','9']:
+                print("\nOpción no válida. Por favor, seleccione una opción válida.")
+                continue 
+            # Las opciones usan las transacciones: se espera a que termine la carga #
+            loader.join()
+
+            if choice == '1':   ##Agregar ingreso##
+                try:
+                    Amount = abs(float(await ainput("Ingrese el monto del ingreso: ")))       
+                    Category = await ainput("Ingrese la categoría del ingreso: ")
+                    if not Category.strip():
+                        Category = "Correcciones"
+                    Description = await ainput("Ingrese una descripción del ingreso: ")
+                    Date = await ainput("Ingrese una fecha (dd-mm-YYYY HH:MM:SS) o deje en blanco para usar la fecha actual: ")
+                    transaction = Transactions('income', Amount, Category, Description, Date)
+                    manager.add_transaction(transaction)
+                    saver.notify()
+                    print("\nIngreso agregado exitosamente.")
+                except ValueError:
+                    print(f"Valor incorrecto, por favor ingrese un número válido para el monto.")
+                # Los cambios quedan en el diario; la instantánea se guarda en segundo plano#
+
+            elif choice == '2': ##Agregar gasto##
+                try:
+                    Amount = abs(float(await ainput("Ingrese el monto del gasto: ")))
+                    Category = await ainput("Ingrese la categoría del gasto: ")
+                    if not Category.strip():
+                        Category = "Correcciones"
+                    Description = await ainput("Ingrese una descripción del gasto: ")
+                    Date = await ainput("Ingrese una fecha (dd-mm-YYYY HH:MM:SS) o deje en blanco para usar la fecha actual: ")
+                    transaction = Transactions('expense', Amount, Category, Description, Date)
+                    manager.add_transaction(transaction)
+                    saver.notify()
+                    print("\nGasto agregado exitosamente.")
+                except ValueError:
+                    print(f"Valor incorrecto, por favor ingrese un número válido para el monto.")
+                # Los cambios quedan en el diario; la instantánea se guarda en segundo plano#
+
+            elif choice == '3': ##Ver balance total##
+                total = manager.total_balance()
+                print(f"\nEl balance total es: {total:.2f}")
             
-    elif choice == '4': ##Ver gastos##
-        _,resumen = manager.expenses()
-        if resumen.empty:
-                print("\nNo hay gastos registrados")
-                continue
+            elif choice == '4': ##Ver gastos##
+                resumen = manager.expenses_by_category()
+                if resumen.empty:
+                        print("\nNo hay gastos registrados")
+                        continue
         
-        print('\nQue tipo de datos desea ver?',
-              '\n1. Gastos Totales',
-              '\n2. Gastos Mensuales',
-              "\n3. Gastos Diarios"
-              "\n4. Gasto Anual"
-              "\n5. Gastos Anuales (últimos 10 años)")
+                print('\nQue tipo de datos desea ver?',
+                      '\n1. Gastos Totales',
+                      '\n2. Gastos Mensuales',
+                      "\n3. Gastos Diarios"
+                      "\n4. Gasto Anual"
+                      "\n5. Gastos Anuales (últimos 10 años)")
         
-        selection = input("Seleccione una opción: ")
-        if selection not in ['1', '2', '3', '4', '5']:
-            print("\nOpción no válida. Por favor, seleccione una opción válida.")
-            continue
-
-        if selection == '1':
-            resumen = resumen.set_index('Category').T
-            print(resumen)
-            total= resumen.iloc[0].sum()
-            print(f'\nTotal de gastos {total}')
-
-        elif selection == '2':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            month = input("\nIngrese el mes (MM): ")
-            status,resumen = manager.monthly_expenses(year, month)
-
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            print(f'\nLos gastos del mes {month if month else pd.Timestamp.now().month} son:')
-            resumen = resumen.set_index('Category').T
-            print('\n', resumen)
-            total= resumen.iloc[0].sum()
-            print(f'\nTotal de gastos {total}')
-
-        elif selection == '3':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            month = input("\nIngrese el mes (MM): ")
-            status,resumen = manager.monthly_expenses(year, month, daily=True)
-
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            print(f'\nLos gastos diarios para el mes {month if month else pd.Timestamp.now().month} son:')
-            print('\n', resumen.to_string(index=False))
-            total = resumen.iloc[:,1:].values.sum()
-            print(f'\nTotal de gastos {total}')
-
-        elif selection == '4':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            status,resumen = manager.anual_expenses(year)
-
-            if status == 'invalid_year':
-                print("\nAño inválido. Por favor ingrese un año como número (ej: 2024).")
-                continue
-            elif status == 'no_data':
-                print(f"\nNo hay gastos registrados para el año {year}.")
-                continue
-
-            # Reindexar para asegurar que todos los meses estén presentes
-            resumen = resumen.reindex(range(1, 13), fill_value=0)
-            # Transponer para tener una sola fila y meses como columnas
-            resumen = resumen.T.to_frame().T
-            resumen.columns = [f'Mes_{m}' for m in resumen.columns]
-            resumen.index = [f'Año_{year}']
-            print(f'\nLos gastos del año {year if year else pd.Timestamp.now().year} son :')
-            print('\n', resumen.to_string(index=False))
-            total = resumen.values.sum()
-            print(f'\nTotal de gastos {total}')
-
-        elif selection == '5':
-            resumen = manager.anual_expenses(all_years=True)
-            status, resumen = manager.anual_expenses(year)
-
-            if status == 'invalid_year':
-                print("\nAño inválido. Por favor ingrese un año como número (ej: 2024).")
-                continue
-            elif status == 'no_data':
-                print(f"\nNo hay gastos registrados para el año {year}.")
-                continue
-
-            actual_year = pd.Timestamp.now().year
-            resumen = resumen.reindex(range(actual_year-9,actual_year + 1),fill_value=0)
-            resumen = resumen.T.to_frame().T
-            print(f'\n Los gastos de los ultimos 10 años son:')
-            print('\n', resumen.to_string(index=False))
-            total= resumen.values.sum()
-            print(f'\nTotal de gastos {total}')
-
-    elif choice == '5': ##Ver gráficos de gastos##
-        _,resumen = manager.expenses()
-        if resumen.empty:
-            print("\nNo hay gastos registrados")
-            continue
-
-        selection = input("\nTipos de gráficos disponibles:"
-                        "\n1. Gastos Mensuales"
-                        "\n2. Gastos Diarios"
-                        "\n3. Gastos Anuales"
-                        "\n4. Gastos de todos los Años"
-                        "\nSeleccione una opción: ")
+                selection = await ainput("Seleccione una opción: ")
+                if selection not in ['1', '2', '3', '4', '5']:
+                    print("\nOpción no válida. Por favor, seleccione una opción válida.")
+                    continue
+
+                if selection == '1':
+                    resumen = resumen.set_index('Category').T
+                    print(resumen)
+                    total= resumen.iloc[0].sum()
+                    print(f'\nTotal de gastos {total}')
+
+                elif selection == '2':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    month = await ainput("\nIngrese el mes (MM): ")
+                    status,resumen = manager.monthly_expenses(year, month)
+
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    print(f'\nLos gastos del mes {month if month else pd.Timestamp.now().month} son:')
+                    resumen = resumen.set_index('Category').T
+                    print('\n', resumen)
+                    total= resumen.iloc[0].sum()
+                    print(f'\nTotal de gastos {total}')
+
+                elif selection == '3':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    month = await ainput("\nIngrese el mes (MM): ")
+                    status,resumen = manager.monthly_expenses(year, month, daily=True)
+
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    print(f'\nLos gastos diarios para el mes {month if month else pd.Timestamp.now().month} son:')
+                    print('\n', resumen.to_string(index=False))
+                    total = resumen.iloc[:,1:].values.sum()
+                    print(f'\nTotal de gastos {total}')
+
+                elif selection == '4':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    status,resumen = manager.anual_expenses(year)
+
+                    if status == 'invalid_year':
+                        print("\nAño inválido. Por favor ingrese un año como número (ej: 2024).")
+                        continue
+                    elif status == 'no_data':
+                        print(f"\nNo hay gastos registrados para el año {year}.")
+                        continue
+
+                    # Reindexar para asegurar que todos los meses estén presentes
+                    resumen = resumen.reindex(range(1, 13), fill_value=0)
+                    # Transponer para tener una sola fila y meses como columnas
+                    resumen = resumen.T.to_frame().T
+                    resumen.columns = [f'Mes_{m}' for m in resumen.columns]
+                    resumen.index = [f'Año_{year}']
+                    print(f'\nLos gastos del año {year if year else pd.Timestamp.now().year} son :')
+                    print('\n', resumen.to_string(index=False))
+                    total = resumen.values.sum()
+                    print(f'\nTotal de gastos {total}')
+
+                elif selection == '5':
+                    resumen = manager.anual_expenses(all_years=True)
+                    status, resumen = manager.anual_expenses(year)
+
+                    if status == 'invalid_year':
+                        print("\nAño inválido. Por favor ingrese un año como número (ej: 2024).")
+                        continue
+                    elif status == 'no_data':
+                        print(f"\nNo hay gastos registrados para el año {year}.")
+                        continue
+
+                    actual_year = pd.Timestamp.now().year
+                    resumen = resumen.reindex(range(actual_year-9,actual_year + 1),fill_value=0)
+                    resumen = resumen.T.to_frame().T
+                    print(f'\n Los gastos de los ultimos 10 años son:')
+                    print('\n', resumen.to_string(index=False))
+                    total= resumen.values.sum()
+                    print(f'\nTotal de gastos {total}')
+
+            elif choice == '5': ##Ver gráficos de gastos##
+                resumen = manager.expenses_by_category()
+                if resumen.empty:
+                    print("\nNo hay gastos registrados")
+                    continue
+
+                selection = await ainput("\nTipos de gráficos disponibles:"
+                                "\n1. Gastos Mensuales"
+                                "\n2. Gastos Diarios"
+                                "\n3. Gastos Anuales"
+                                "\n4. Gastos de todos los Años"
+                                "\n5. Gastos en el tiempo (varios años)"
+                                "\nSeleccione una opción: ")
         
-        if selection not in ['1', '2', '3', '4']:
-            print("\nOpción no válida. Por favor, seleccione una opción válida.")
-            continue
-
-        if selection == '1':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            month = input("\nIngrese el mes (MM): ")
-            status,resumen = manager.monthly_expenses(year, month)
-
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            title = (f'Gastos Mensuales {month if month else pd.Timestamp.now().month}-'
-                     f'{year if year else pd.Timestamp.now().year}')
-            graphs.expenses_graphics(resumen, title=title, graph_type='pie')
-
-        elif selection == '2':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            month = input("\nIngrese el mes (MM): ")
-            status,resumen = manager.monthly_expenses(year, month, daily=True)
-
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            title = (f'Gastos Diarios {month if month else pd.Timestamp.now().month}-'
-                     f'{year if year else pd.Timestamp.now().year}')
-            graphs.expenses_graphics(resumen, title=title, graph_type='lineplot')
-
-        elif selection == '3':
-            print('\nPara obtener estadisticas actuales NO introduzca datos')
-            year = input("\nIngrese el año (YYYY): ")
-            status,resumen = manager.anual_expenses(year)
-
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            resumen = resumen.reindex(range(1,13),fill_value=0).reset_index()
-            graphs.expenses_graphics(resumen, f'Gasto anual del {year if year else pd.Timestamp.now().year}')
-
-        elif selection == '4':
-            status, resumen = manager.anual_expenses(all_years=True)
+                if selection not in ['1', '2', '3', '4', '5']:
+                    print("\nOpción no válida. Por favor, seleccione una opción válida.")
+                    continue
+
+                if selection == '1':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    month = await ainput("\nIngrese el mes (MM): ")
+                    status,resumen = manager.monthly_expenses(year, month)
+
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    title = (f'Gastos Mensuales {month if month else pd.Timestamp.now().month}-'
+                             f'{year if year else pd.Timestamp.now().year}')
+                    graphs.expenses_graphics(resumen, title=title, graph_type='pie')
+
+                elif selection == '2':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    month = await ainput("\nIngrese el mes (MM): ")
+                    status,resumen = manager.monthly_expenses(year, month, daily=True)
+
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    title = (f'Gastos Diarios {month if month else pd.Timestamp.now().month}-'
+                             f'{year if year else pd.Timestamp.now().year}')
+                    graphs.expenses_graphics(resumen, title=title, graph_type='lineplot')
+
+                elif selection == '3':
+                    print('\nPara obtener estadisticas actuales NO introduzca datos')
+                    year = await ainput("\nIngrese el año (YYYY): ")
+                    status,resumen = manager.anual_expenses(year)
+
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    resumen = resumen.reindex(range(1,13),fill_value=0).reset_index()
+                    graphs.expenses_graphics(resumen, f'Gasto anual del {year if year else pd.Timestamp.now().year}')
+
+                elif selection == '4':
+                    status, resumen = manager.anual_expenses(all_years=True)
             
-            if status == 'invalid_date':
-                print('\nFecha inválida. Por favor ingrese un año y mes como números')
-                continue
-            elif status == 'no_data':
-                print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
-                continue
-
-            year = pd.Timestamp.now().year
-            resumen = resumen.reindex(range(year-9,year + 1),fill_value=0).reset_index()
-            graphs.expenses_graphics(resumen, f'Gastos de los últimos 10 años {year-10}-{year}' )
+                    if status == 'invalid_date':
+                        print('\nFecha inválida. Por favor ingrese un año y mes como números')
+                        continue
+                    elif status == 'no_data':
+                        print(f"\n""No hay gastos registrados para el mes {month} del año {year}.")
+                        continue
+
+                    year = pd.Timestamp.now().year
+                    resumen = resumen.reindex(range(year-9,year + 1),fill_value=0).reset_index()
+                    graphs.expenses_graphics(resumen, f'Gastos de los últimos 10 años {year-10}-{year}' )
+
+                elif selection == '5':
+                    print('\nPara usar todo el historial NO introduzca datos')
+                    start = (await ainput("\nFecha inicio (YYYY-MM-DD): ")).strip()
+                    end = (await ainput("\nFecha fin (YYYY-MM-DD): ")).strip()
+                    try:
+                        resumen, title, graph_type = graphs.timeseries_chart(start or None, end or None)
+                    except ValueError:
+                        print('\nFecha inválida. Use el formato YYYY-MM-DD')
+                        continue
+                    if resumen.empty:
+                        print("\nNo hay gastos registrados en ese periodo.")
+                        continue
+                    graphs.expenses_graphics(resumen, title, graph_type)
     
-    elif choice == '6': ##Eliminar transacción##
-        if manager.df_transactions.empty:
-            print("\nNo hay transacciones registradas para eliminar.")
-            continue
-
-        print("\n========Lista de Transacciones========")
-        df_aux = manager.df_transactions.copy()
-        print(df_aux[['Model', 'Amount', 'Category', 'Description', 'Date']].to_string(index=True))
+            elif choice == '6': ##Eliminar transacción##
+                if len(manager) == 0:
+                    print("\nNo hay transacciones registradas para eliminar.")
+                    continue
+
+                print("\n========Lista de Transacciones========")
+                df_aux = manager.list_transactions()
+                print(df_aux[['Index', 'Model', 'Amount', 'Category', 'Description', 'Date']].to_string(index=False))
         
-        try:
-            idx = int(input("\nIngrese el índice de la transacción a eliminar: "))
-            if manager.delete_transaction(idx):
-                print(f"\nTransacción con índice {idx} eliminada correctamente.")
-            else:
-                print(f"\nÍndice inválido. No se pudo eliminar la transacción.")
-        except ValueError:
-            print("\nEntrada inválida. Debe ingresar un número entero.")
-
-        manager.save_excel()
+                try:
+                    idx = int(await ainput("\nIngrese el índice de la transacción a eliminar: "))
+                    if manager.delete_transaction(idx):
+                        saver.notify()
+                        print(f"\nTransacción con índice {idx} eliminada correctamente.")
+                    else:
+                        print(f"\nÍndice inválido. No se pudo eliminar la transacción.")
+                except ValueError:
+                    print("\nEntrada inválida. Debe ingresar un número entero.")
     
-    elif choice == '7': ##Editar transacción##
-        if manager.df_transactions.empty:
-            print("\nNo hay transacciones registradas para editar.")
-            continue
-        # Mostrar todas las transacciones con índice
-        df_temp = manager.list_transactions()
-        print("\nTransacciones registradas:")
-        print(df_temp.to_string(index=False))
-
-        try:
-            index = int(input("Ingrese el índice de la transacción que desea editar: "))
-        except ValueError:
-            print("Índice inválido.")
-            continue
-
-        if index < 0 or index >= len(manager.df_transactions):
-            print("Índice fuera de rango.")
-            continue
-
-        print("\nCampos disponibles: Model, Amount, Category, Description, Date")
-        campo = input("Ingrese el nombre del campo que desea editar: ").strip()
-        if campo not in ['Model', 'Amount', 'Category', 'Description', 'Date']:
-            print("Campo no válido.")
-            continue
-
-        nuevo_valor = input(f"Ingrese el nuevo valor para '{campo}': ").strip()
+            elif choice == '7': ##Editar transacción##
+                if len(manager) == 0:
+                    print("\nNo hay transacciones registradas para editar.")
+                    continue
+                # Mostrar todas las transacciones con índice
+                df_temp = manager.list_transactions()
+                print("\nTransacciones registradas:")
+                print(df_temp.to_string(index=False))
+
+                try:
+                    index = int(await ainput("Ingrese el índice de la transacción que desea editar: "))
+                except ValueError:
+                    print("Índice inválido.")
+                    continue
+
+                if index < 0 or index >= len(manager):
+                    print("Índice fuera de rango.")
+                    continue
+
+                print("\nCampos disponibles: Model, Amount, Category, Description, Date")
+                campo = (await ainput("Ingrese el nombre del campo que desea editar: ")).strip()
+                if campo not in ['Model', 'Amount', 'Category', 'Description', 'Date']:
+                    print("Campo no válido.")
+                    continue
+
+                nuevo_valor = (await ainput(f"Ingrese el nuevo valor para '{campo}': ")).strip()
         
-        if campo == 'Amount':
-            try:
-                nuevo_valor = float(nuevo_valor)
-            except ValueError:
-                print("Monto inválido.")
-                continue
-
-        actualizado = manager.edit_transaction(index, **{campo: nuevo_valor})
-        if actualizado:
-            print("\nTransacción actualizada exitosamente.")
-        else:
-            print("\nError al actualizar la transacción.")
-
-    elif choice == '8': ##Filtrar transacciones##
-        print("\n=== Buscar transacciones ===")
-        model = input("Tipo (income/expense) o dejar en blanco: ").strip()
-        category = input("Categoría o dejar en blanco: ").strip()
-        description = input("Descripción o dejar en blanco: ").strip()
-        start_date = input("Fecha inicio (dd-mm-YYYY HH:MM:SS) o dejar en blanco: ").strip()
-        end_date = input("Fecha fin (dd-mm-YYYY HH:MM:SS) o dejar en blanco: ").strip()
+                if campo == 'Amount':
+                    try:
+                        nuevo_valor = float(nuevo_valor)
+                    except ValueError:
+                        print("Monto inválido.")
+                        continue
+
+                actualizado = manager.edit_transaction(index, **{campo: nuevo_valor})
+                if actualizado:
+                    saver.notify()
+                    print("\nTransacción actualizada exitosamente.")
+                else:
+                    print("\nError al actualizar la transacción.")
+
+            elif choice == '8': ##Filtrar transacciones##
+                print("\n=== Buscar transacciones ===")
+                model = (await ainput("Tipo (income/expense) o dejar en blanco: ")).strip()
+                category = (await ainput("Categoría o dejar en blanco: ")).strip()
+                description = (await ainput("Descripción o dejar en blanco: ")).strip()
+                start_date = (await ainput("Fecha inicio (dd-mm-YYYY HH:MM:SS) o dejar en blanco: ")).strip()
+                end_date = (await ainput("Fecha fin (dd-mm-YYYY HH:MM:SS) o dejar en blanco: ")).strip()
         
-        search = manager.search_transactions(
-            model=model if model else None,
-            category=category if category else None,
-            description=description if description else None,
-            start_date=start_date if start_date else None,
-            end_date=end_date if end_date else None
-        )
-
-        if search.empty:
-            print("\nNo se encontraron transacciones con los criterios dados.")
-        else:
-            print(f"\nSe encontraron {len(search)} transacciones:\n")
-            print(search.to_string(index=True))
+                search = manager.search_transactions(
+                    model=model if model else None,
+                    category=category if category else None,
+                    description=description if description else None,
+                    start_date=start_date if start_date else None,
+                    end_date=end_date if end_date else None
+                )
+
+                if search.empty:
+                    print("\nNo se encontraron transacciones con los criterios dados.")
+                else:
+                    print(f"\nSe encontraron {len(search)} transacciones:\n")
+                    print(search.to_string(index=True))
         
 
-    elif choice == '9': ##Guardar y salir##
-        file_path = manager.save_excel()
-        print(f"\nDatos guardados en {file_path}. Saliendo...")
-        break
+            elif choice == '9': ##Guardar y salir##
+                file_path = saver.flush(force=True)
+                print(f"\nDatos guardados en {file_path}. Saliendo...")
+                break
+    finally:
+        # Lo pendiente se guarda siempre, también al salir con Ctrl-C #
+        saver.flush()
+        if instrumentation is not None:
+            logging.getLogger('gestor').info(instrumentation.log_line())
+
+##El menú solo arranca al ejecutar el archivo (las pruebas importan run)##
+if __name__ == '__main__':
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, EOFError):
+        print("\nSaliendo...")
+
+    #Comprobando errores#
+    if len(manager.errors):
+        print("\nSe han registrado errores durante la ejecución del programa.")
+        print(manager.errors.frame().to_string(index=False))
+        if manager.errors.dropped:
+            print(f"... y {manager.errors.dropped} errores más no mostrados. Total por tipo:")
+            for error, count in manager.errors.counts.most_common():
+                print(f"  {error}: {count}")
     
-#Comprobando errores#
-if not ERROR.empty:
-    print("\nSe han registrado errores durante la ejecución del programa.")
-    print(ERROR.to_string(index=False))
-    
\ No newline at end of file
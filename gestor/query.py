@@ -0,0 +1,174 @@
+import copy
+import numpy as np
+import pandas as pd
+
+# Con Copy-on-Write (siempre activo desde pandas 3) una copia superficial solo copia los datos
+# si alguien la modifica; con versiones anteriores hay que copiar para no alterar el libro #
+COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+# Claves de agrupación: nombre aceptado -> columna del resultado (las mismas que storage.GROUP_KEYS) #
+GROUPS = {
+    'year': 'Years', 'years': 'Years',
+    'month': 'Month',
+    'day': 'Day',
+    'date': 'DayDate', 'daydate': 'DayDate',
+    'category': 'Category',
+}
+
+
+def read_only_view(df: pd.DataFrame) -> pd.DataFrame:
+    '''Devuelve un DataFrame nuevo que comparte los datos de df hasta que se modifique.'''
+    return df.copy(deep=not COPY_ON_WRITE)
+
+
+class Query:
+    ''' Consulta diferida sobre las transacciones de un FinanceManager.
+    Cada filtro devuelve una consulta nueva y no toca los datos; al pedir el resultado
+    (rows o sum) se planifica la cadena completa y los filtros se resuelven donde es más
+    barato: en SQLite con una sola consulta, en el cubo de gastos si basta con sumas por
+    día y categoría, o con los índices de fechas, textos y tipo, materializando una sola
+    vez las filas encontradas.
+
+        manager.query().model('expense').between(inicio, fin).group_by('month', 'Category').sum()
+
+    Atributos:
+        manager (FinanceManager): Gestor sobre el que se consulta.
+    Métodos:
+        model: Filtra por tipo de transacción.
+        between: Filtra por rango de fechas (ambos extremos incluidos).
+        category: Filtra por texto contenido en la categoría.
+        description: Filtra por texto contenido en la descripción.
+        group_by: Agrupa por año, mes, día, fecha o categoría.
+        rows: Transacciones que cumplen los filtros.
+        sum: Suma de los montos, total o por grupo.
+    '''
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._model = None
+        self._start = None
+        self._end = None
+        self._category = None
+        self._description = None
+        self._keys = []
+
+    def _with(self, **changes) -> 'Query':
+        '''Copia de la consulta con los cambios indicados.'''
+        query = copy.copy(self)
+        for name, value in changes.items():
+            setattr(query, f'_{name}', value)
+        return query
+
+    def model(self, model: str) -> 'Query':
+        '''Filtra por tipo ('income' o 'expense', sin distinguir mayúsculas).'''
+        return self._with(model=model.lower() if model else None)
+
+    def between(self, start=None, end=None) -> 'Query':
+        '''Filtra por fechas en [start, end]; None deja el extremo abierto.'''
+        return self._with(start=pd.Timestamp(start) if start is not None else None,
+                          end=pd.Timestamp(end) if end is not None else None)
+
+    def category(self, text: str) -> 'Query':
+        '''Filtra por categorías que contienen el texto (sin distinguir mayúsculas).'''
+        return self._with(category=text or None)
+
+    def description(self, text: str) -> 'Query':
+        '''Filtra por descripciones que contienen el texto (sin distinguir mayúsculas).'''
+        return self._with(description=text or None)
+
+    def group_by(self, *keys: str) -> 'Query':
+        '''Agrupa por 'year', 'month', 'day', 'date' o 'category' (en ese orden de columnas).'''
+        columns = []
+        for key in keys:
+            column = GROUPS.get(key.lower())
+            if column is None:
+                raise ValueError(f'Clave de agrupación no válida: {key}')
+            columns.append(column)
+        return self._with(keys=columns)
+
+#########################################
+#Plan de ejecución#
+#########################################
+
+    def _filters(self) -> dict:
+        '''Filtros en el formato de SQLiteStorage.'''
+        return {'model': self._model, 'category': self._category, 'description': self._description,
+                'start': self._start, 'end': self._end}
+
+    def _day_aligned(self) -> bool:
+        '''Indica si el rango de fechas cubre días completos (lo que distingue el cubo).'''
+        start_ok = self._start is None or self._start == self._start.normalize()
+        # Se mide lo que falta hasta el día siguiente para no pasar a nanosegundos (años como 3000) #
+        end_ok = (self._end is None
+                  or self._end.normalize() + pd.Timedelta(days=1) - self._end == pd.Timedelta(1, 'ns'))
+        return start_ok and end_ok
+
+    def _uses_cube(self) -> bool:
+        '''El cubo guarda sumas de gastos por día y categoría: basta si no se filtra por descripción.'''
+        return (self.manager.storage is None and self._model == 'expense'
+                and self._description is None and self._day_aligned())
+
+    def _positions(self):
+        '''Posiciones de las filas que cumplen los filtros (None si son todas), usando los índices.'''
+        manager = self.manager
+        positions = None
+        if self._start is not None or self._end is not None:
+            positions = manager.date_index.range(self._start, self._end)
+        for column, text in (('Category', self._category), ('Description', self._description)):
+            if text:
+                found = manager.text_index[column].search(text)
+                positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+        if self._model:
+            positions = manager._model_positions(self._model, positions)
+        return positions
+
+    def rows(self) -> pd.DataFrame:
+        '''Transacciones que cumplen los filtros, indexadas por su posición.
+        Las filas se copian una sola vez; sin filtros se devuelve una vista de solo lectura.'''
+        if self.manager.storage is not None:
+            return self.manager.storage.select(**self._filters())
+        positions = self._positions()
+        df = self.manager.df_transactions
+        return read_only_view(df) if positions is None else df.take(positions)
+
+    def _cube_records(self) -> pd.DataFrame:
+        '''Celdas del cubo de gastos dentro del rango y de las categorías pedidas.'''
+        # Se suma en el cubo al nivel que piden las claves: por día y categoría solo si hace falta #
+        records = self.manager.cube.records(self._start, self._end,
+                                            day=bool({'Day', 'DayDate'} & set(self._keys)),
+                                            category=bool(self._category) or 'Category' in self._keys)
+        if self._category and not records.empty:
+            names = records['Category'].astype('str').str.lower()
+            records = records[records['Category'].notna() & names.str.contains(self._category.lower(), regex=False)]
+        return records
+
+    def _row_records(self) -> pd.DataFrame:
+        '''Filas filtradas con las columnas de agrupación calculadas a partir de Date.'''
+        positions = self._positions()
+        df = self.manager.df_transactions[['Amount', 'Category', 'Date']]
+        if positions is not None:
+            df = df.take(positions)
+        dates = df['Date'].dt
+        return pd.DataFrame({'Years': dates.year, 'Month': dates.month, 'Day': dates.day,
+                             'Category': df['Category'], 'Amount': df['Amount']})
+
+    def sum(self):
+        '''Suma de los montos: un float sin group_by, o un DataFrame con las claves y Amount
+        ordenado por las claves.'''
+        keys = self._keys
+        if self.manager.storage is not None:
+            result = self.manager.storage.aggregate(keys, **self._filters())
+            if not keys:
+                return result
+            if 'DayDate' in keys:
+                result['DayDate'] = pd.to_datetime(result['DayDate'])
+            return result
+        records = self._cube_records() if self._uses_cube() else self._row_records()
+        if not keys:
+            return float(records['Amount'].sum())
+        if records.empty:
+            return pd.DataFrame(columns=keys + ['Amount'])
+        if 'DayDate' in keys:
+            records = records.assign(DayDate=pd.to_datetime(
+                records[['Years', 'Month', 'Day']].rename(columns={'Years': 'year', 'Month': 'month', 'Day': 'day'})))
+        return records.groupby(keys, observed=True)['Amount'].sum().reset_index()
@@ -0,0 +1,228 @@
+import sqlite3
+import os
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Model', 'Amount', 'Category', 'Description', 'Date']
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    Model TEXT,
+    Amount REAL,
+    Category TEXT,
+    Description TEXT,
+    Date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (Date);
+CREATE INDEX IF NOT EXISTS idx_transactions_model_date ON transactions (Model, Date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (Category);
+CREATE TABLE IF NOT EXISTS deleted_ids (
+    id INTEGER PRIMARY KEY
+);
+'''
+
+# Expresiones SQL permitidas para agrupar #
+GROUP_KEYS = {
+    'Category': 'Category',
+    'Day': "CAST(strftime('%d', Date) AS INTEGER)",
+    'Month': "CAST(strftime('%m', Date) AS INTEGER)",
+    'Years': "CAST(strftime('%Y', Date) AS INTEGER)",
+    'DayDate': 'date(Date)',
+}
+
+
+class SQLiteStorage:
+    ''' Almacenamiento de transacciones en una base de datos SQLite local.
+    Las transacciones se guardan en una tabla con índices sobre Date, Model y Category,
+    de modo que las búsquedas y los resúmenes por periodo se resuelven con consultas
+    indexadas sin cargar todo el libro en memoria.
+    El id de cada fila no cambia nunca, así borrar no reescribe la tabla. Los ids
+    borrados por debajo del mayor id vivo se anotan en deleted_ids; la posición de una
+    fila (la que ve el usuario, igual que en el DataFrame en memoria) es su id - 1
+    menos los ids borrados anteriores, y se calcula por búsqueda binaria.
+    Atributos:
+        path (str): Ruta del archivo de la base de datos.
+        ISO_FORMAT (str): Formato con el que se guardan las fechas (ordenable como texto).
+    Métodos:
+        insert: Inserta una transacción.
+        insert_frame: Inserta todas las filas de un DataFrame.
+        count: Cuenta las transacciones, opcionalmente por tipo.
+        delete: Elimina una transacción por su posición.
+        row: Devuelve una transacción por su posición.
+        update: Modifica una columna de una transacción por su posición.
+        select: Devuelve las transacciones que cumplen los filtros.
+        iter_chunks: Recorre todas las transacciones por bloques.
+        sum_amount: Suma los montos de un tipo de transacción.
+        aggregate: Suma los montos filtrados, en total o agrupando por categoría, día, mes o año.
+        close: Cierra la conexión.
+    '''
+    ISO_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    def __init__(self, path: str = os.path.join('data', 'finanzas.db')):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        # lower() de SQLite solo convierte ASCII: se usa el de Python, igual que en memoria #
+        self.conn.create_function('py_lower', 1, self._lower, deterministic=True)
+        self.conn.executescript(SCHEMA)
+        self._deleted = np.array([row[0] for row in self.conn.execute('SELECT id FROM deleted_ids ORDER BY id')],
+                                 dtype='int64')
+
+    def _row_id(self, index: int) -> int:
+        '''Id de la fila en la posición indicada.'''
+        shifted = self._deleted - 1 - np.arange(len(self._deleted))
+        return index + 1 + int(np.searchsorted(shifted, index, side='right'))
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        '''Posiciones de las filas con los ids indicados.'''
+        return ids - 1 - np.searchsorted(self._deleted, ids)
+
+    @staticmethod
+    def _lower(text):
+        '''Minúsculas con las reglas de Python (incluye tildes y eñes).'''
+        return text.lower() if isinstance(text, str) else text
+
+    def _to_db(self, column: str, value):
+        '''Convierte un valor de Python/pandas al tipo que se guarda en la tabla.'''
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        if column == 'Date':
+            return pd.Timestamp(value).strftime(self.ISO_FORMAT)
+        if column == 'Amount':
+            return float(value)
+        return str(value)
+
+    def insert(self, data: dict) -> None:
+        '''Inserta una transacción al final de la tabla.'''
+        row = tuple(self._to_db(col, data.get(col)) for col in COLUMNS)
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO transactions (Model, Amount, Category, Description, Date) '
+                'VALUES (?, ?, ?, ?, ?)', row)
+
+    def insert_frame(self, df: pd.DataFrame) -> None:
+        '''Inserta todas las filas de un DataFrame en una sola transacción.'''
+        rows = (tuple(self._to_db(col, value) for col, value in zip(COLUMNS, values))
+                for values in df[COLUMNS].itertuples(index=False, name=None))
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO transactions (Model, Amount, Category, Description, Date) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+
+    def count(self, model: str = None) -> int:
+        '''Cuenta las transacciones, opcionalmente solo las de un tipo.'''
+        if model:
+            return self.conn.execute('SELECT COUNT(*) FROM transactions WHERE Model = ?',
+                                     (model,)).fetchone()[0]
+        return self.conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    def delete(self, index: int) -> bool:
+        '''Elimina la transacción en la posición indicada; las siguientes se desplazan
+        sin reescribir sus filas.'''
+        if index < 0:
+            return False
+        row_id = self._row_id(index)
+        with self.conn:
+            deleted = self.conn.execute('DELETE FROM transactions WHERE id = ?', (row_id,)).rowcount
+            if not deleted:
+                return False
+            self.conn.execute('INSERT INTO deleted_ids (id) VALUES (?)', (row_id,))
+            # Por encima del mayor id vivo no hay huecos: SQLite reutiliza esos ids al insertar #
+            self.conn.execute('DELETE FROM deleted_ids WHERE id > (SELECT COALESCE(MAX(id), 0) FROM transactions)')
+        self._deleted = np.array([row[0] for row in self.conn.execute('SELECT id FROM deleted_ids ORDER BY id')],
+                                 dtype='int64')
+        return True
+
+    def row(self, index: int) -> dict:
+        '''Devuelve la transacción en la posición indicada como diccionario.'''
+        if index < 0:
+            return None
+        values = self.conn.execute(f'SELECT {", ".join(COLUMNS)} FROM transactions WHERE id = ?',
+                                   (self._row_id(index),)).fetchone()
+        if values is None:
+            return None
+        data = dict(zip(COLUMNS, values))
+        if data['Date'] is not None:
+            data['Date'] = pd.to_datetime(data['Date'], format=self.ISO_FORMAT)
+        return data
+
+    def update(self, index: int, column: str, value) -> bool:
+        '''Modifica una columna de la transacción en la posición indicada.'''
+        if column not in COLUMNS or index < 0:
+            return False
+        with self.conn:
+            updated = self.conn.execute(f'UPDATE transactions SET {column} = ? WHERE id = ?',
+                                        (self._to_db(column, value), self._row_id(index))).rowcount
+        return bool(updated)
+
+    def _where(self, model: str = None, category: str = None, description: str = None,
+               start: pd.Timestamp = None, end: pd.Timestamp = None) -> tuple:
+        '''Construye la cláusula WHERE y sus parámetros.'''
+        clauses, params = [], []
+        if model:
+            clauses.append('Model = ?')
+            params.append(model.lower())
+        if category:
+            clauses.append('instr(py_lower(Category), ?) > 0')
+            params.append(category.lower())
+        if description:
+            clauses.append('instr(py_lower(Description), ?) > 0')
+            params.append(description.lower())
+        if start is not None:
+            clauses.append('Date >= ?')
+            params.append(start.strftime(self.ISO_FORMAT))
+        if end is not None:
+            clauses.append('Date <= ?')
+            params.append(end.strftime(self.ISO_FORMAT))
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return where, params
+
+    def select(self, **filters) -> pd.DataFrame:
+        '''Devuelve las transacciones que cumplen los filtros, indexadas por posición.'''
+        where, params = self._where(**filters)
+        df = pd.read_sql_query(
+            f'SELECT id, {", ".join(COLUMNS)} FROM transactions{where} ORDER BY id',
+            self.conn, params=params, index_col='id')
+        df.index = pd.Index(self._positions(df.index.to_numpy(dtype='int64')))
+        return self._from_db(df)
+
+    def _from_db(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''Convierte los tipos leídos de la tabla a los del DataFrame en memoria.'''
+        df['Amount'] = df['Amount'].astype('float')
+        df['Date'] = pd.to_datetime(df['Date'], format=self.ISO_FORMAT).astype('datetime64[ns]')
+        return df
+
+    def iter_chunks(self, chunksize: int):
+        '''Recorre todas las transacciones en bloques de chunksize filas.'''
+        for chunk in pd.read_sql_query(f'SELECT {", ".join(COLUMNS)} FROM transactions ORDER BY id',
+                                       self.conn, chunksize=chunksize):
+            yield self._from_db(chunk)
+
+    def sum_amount(self, model: str) -> float:
+        '''Suma los montos de todas las transacciones de un tipo.'''
+        total = self.conn.execute('SELECT SUM(Amount) FROM transactions WHERE Model = ?',
+                                  (model,)).fetchone()[0]
+        return float(total or 0.0)
+
+    def aggregate(self, keys: list, **filters):
+        '''Suma los montos de las transacciones que cumplen los filtros (los de select),
+        agrupando por las claves de GROUP_KEYS. Sin claves retorna la suma total.'''
+        where, params = self._where(**filters)
+        if not keys:
+            total = self.conn.execute(f'SELECT SUM(Amount) FROM transactions{where}', params).fetchone()[0]
+            return float(total or 0.0)
+        select = ', '.join(f'{GROUP_KEYS[key]} AS {key}' for key in keys)
+        group = ', '.join(key for key in keys)
+        # Las filas sin fecha no pertenecen a ningún periodo #
+        if any(key != 'Category' for key in keys):
+            where = f'{where} AND Date IS NOT NULL' if where else ' WHERE Date IS NOT NULL'
+        return pd.read_sql_query(
+            f'SELECT {select}, SUM(Amount) AS Amount FROM transactions{where} GROUP BY {group} ORDER BY {group}',
+            self.conn, params=params)
+
+    def close(self) -> None:
+        '''Cierra la conexión con la base de datos.'''
+        self.conn.close()
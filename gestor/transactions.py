@@ -1,7 +1,25 @@
 from datetime import datetime
 from typing import Optional
 
-class Transactions: 
+DATE_FORMAT = '%d-%m-%Y %H:%M:%S' #formato de fecha y hora
+
+def parse_date(value: str, date_format: str = DATE_FORMAT) -> datetime:
+    '''Convierte una fecha 'dd-mm-YYYY HH:MM:SS' a datetime.
+    Si el texto tiene exactamente ese formato se construye la fecha cortando la cadena;
+    en cualquier otro caso se usa strptime, que decide si es válida y lanza ValueError.'''
+    if (date_format == DATE_FORMAT and isinstance(value, str) and len(value) == 19
+            and value[2] == '-' and value[5] == '-' and value[10] == ' '
+            and value[13] == ':' and value[16] == ':'):
+        digits = value[0:2] + value[3:5] + value[6:10] + value[11:13] + value[14:16] + value[17:19]
+        if digits.isascii() and digits.isdigit():
+            try:
+                return datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]),
+                                int(value[11:13]), int(value[14:16]), int(value[17:19]))
+            except ValueError:
+                pass # p.ej. 31-02: strptime da el mismo error que antes
+    return datetime.strptime(value, date_format)
+
+class Transactions:
     ''' Clase de las transacciones financieras.
     Esta clase representa una transacción financiera, ya sea un ingreso o un gasto.
     Atributos:
@@ -12,8 +30,8 @@ class Transactions:
         date (str): Fecha y hora de la transacción en formato 'dd-mm-YYYY HH:MM:SS'.
         DATE_FORMAT (str): Formato de fecha y hora utilizado para la transacción.
     '''
-    DATE_FORMAT = '%d-%m-%Y %H:%M:%S' #formato de fecha y hora
-    
+    DATE_FORMAT = DATE_FORMAT
+
     def __init__(self, model: str, amount: float, category: str, description: str, date: Optional[str] = None):
         self.Model = model #ingreso o gasto#
         self.Amount = amount
@@ -21,7 +39,7 @@ class Transactions:
         self.Description = description
         if date:
                 try:
-                    self.Date = datetime.strptime(date, self.DATE_FORMAT) #convirtiendo str
+                    self.Date = parse_date(date, self.DATE_FORMAT) #convirtiendo str
                 except ValueError:
                     raise ValueError(f"Formato de fecha inválido: {date}")
         else:
@@ -31,4 +49,64 @@ class Transactions:
         # Formatea la fecha solo al mostrarla
         formated_date = self.Date.strftime(self.DATE_FORMAT)
         parts = [self.Model, self.Amount, self.Category, self.Description, formated_date]
-        return ' - '.join(str(x) for x in parts if x)
\ No newline at end of file
+        return ' - '.join(str(x) for x in parts if x)
+
+class TransactionRecord:
+    ''' Versión compacta de Transactions.
+    Usa __slots__, por lo que no tiene un __dict__ por instancia, y valida igual que
+    Transactions. Pensada para cargas y lotes con muchas transacciones.
+    Atributos:
+        Model, Amount, Category, Description, Date: Igual que en Transactions.
+    Métodos:
+        from_rows: Crea muchos registros a partir de tuplas de textos.
+        to_dict: Devuelve los campos como diccionario.
+    '''
+    __slots__ = ('Model', 'Amount', 'Category', 'Description', 'Date')
+    DATE_FORMAT = DATE_FORMAT
+
+    def __init__(self, model: str, amount: float, category: str, description: str, date: Optional[str] = None):
+        self.Model = model
+        self.Amount = amount
+        self.Category = category
+        self.Description = description
+        if date:
+            try:
+                self.Date = parse_date(date, self.DATE_FORMAT)
+            except ValueError:
+                raise ValueError(f"Formato de fecha inválido: {date}")
+        else:
+            self.Date = datetime.now()
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        '''Crea registros a partir de tuplas (model, amount, category, description, date).
+        Las fechas repetidas se convierten una sola vez.'''
+        parsed = {}
+        records = []
+        for model, amount, category, description, date in rows:
+            record = cls.__new__(cls)
+            record.Model = model
+            record.Amount = float(amount)
+            record.Category = category
+            record.Description = description
+            if date:
+                value = parsed.get(date)
+                if value is None:
+                    try:
+                        value = parsed[date] = parse_date(date, cls.DATE_FORMAT)
+                    except ValueError:
+                        raise ValueError(f"Formato de fecha inválido: {date}")
+                record.Date = value
+            else:
+                record.Date = datetime.now()
+            records.append(record)
+        return records
+
+    def to_dict(self) -> dict:
+        '''Devuelve los campos como diccionario (equivalente a Transactions.__dict__).'''
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self) -> str:
+        formated_date = self.Date.strftime(self.DATE_FORMAT)
+        parts = [self.Model, self.Amount, self.Category, self.Description, formated_date]
+        return ' - '.join(str(x) for x in parts if x)
@@ -1,78 +1,339 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import os
+import json
+import hashlib
+import numpy as np
 from typing import List
+from concurrent.futures import ProcessPoolExecutor
 from gestor.core import FinanceManager
 
+def _plotting() -> tuple:
+    '''Importa matplotlib y seaborn la primera vez que se pide un gráfico.
+    Así importar el paquete (o abrir el menú) no paga el costo de cargarlas.'''
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+# Niveles de agregación de las series temporales, de más fino a más grueso #
+LEVELS = {'D': 'día', 'W': 'semana', 'MS': 'mes'}
+
+def minmax_downsample(values: np.ndarray, max_points: int) -> np.ndarray:
+    '''Posiciones a conservar al reducir una serie a como mucho max_points puntos.
+    Se queda con el primer y el último punto y con el mínimo y el máximo de cada tramo
+    intermedio, así los picos de gasto no desaparecen como pasaría con un promedio.'''
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 2:
+        return np.arange(max_points)
+    # Dos puntos por tramo y dos más para los extremos de la serie #
+    buckets = (max_points - 2) // 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype('int64')
+    keep = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        chunk = values[lo:hi]
+        keep.append(lo + int(np.argmin(chunk)))
+        keep.append(lo + int(np.argmax(chunk)))
+    return np.unique(keep)
+
+def prepare_timeseries(daily: pd.Series, level: str = None, max_points: int = 800) -> tuple:
+    '''Prepara una serie de gastos diarios para graficarla.
+    Si no se indica el nivel se elige el más fino (día, semana o mes) que no supere
+    max_points puntos; si aun así hay más, se reduce conservando mínimos y máximos.
+    Retorna (DataFrame con Date y Amount, nivel usado).'''
+    daily = daily.sort_index()
+    if daily.empty:
+        return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Amount': pd.Series(dtype='float')}), 'D'
+    if level is None:
+        days = (daily.index[-1] - daily.index[0]).days + 1
+        spans = {'D': days, 'W': days / 7, 'MS': days / 30.44}
+        level = next((key for key in LEVELS if spans[key] <= max_points), 'MS')
+    # Los días sin gastos cuentan como 0 para que la línea no los salte #
+    series = daily.resample(level).sum()
+    if len(series) > max_points:
+        series = series.iloc[minmax_downsample(series.to_numpy(), max_points)]
+    return pd.DataFrame({'Date': series.index, 'Amount': series.to_numpy()}), level
+
+def render_charts(charts: list) -> List[str]:
+    '''Genera en modo headless una lista de gráficos (df, título, tipo, ruta).
+    Se ejecuta en los procesos del pool: cada proceso reutiliza una sola figura.'''
+    # El proceso principal lleva el registro de la caché #
+    graphs = Graphs(None, headless=True, cache=False)
+    return graphs.render_batch(charts)
+
 class Graphs:
 
     ''' Clase para generar gráficos de gastos.
     Esta clase utiliza la biblioteca Seaborn para crear gráficos de gastos
     basados en las transacciones financieras almacenadas en la clase FinanceManager.
-    
+    En modo headless se dibuja con el backend Agg y la API de objetos de matplotlib
+    (sin el estado global de pyplot ni ventanas) sobre una figura que se reutiliza
+    entre gráficos, pensado para generar muchos PNG en un servidor.
+
     Atributos:
         manager (FinanceManager): Instancia de la clase FinanceManager que contiene las transacciones.
+        headless (bool): Si es True los gráficos solo se guardan como PNG, sin mostrarse.
+        cache (bool): Si es True no se vuelve a generar una imagen cuyo contenido
+            (resumen, tipo y título) no cambió desde la última vez.
+        CACHE_FILE (str): Registro de la clave con la que se generó cada imagen.
     Métodos:
         expenses_graphics: Genera gráficos de gastos en diferentes formatos (barra, pastel, línea).
         save_graph: Guarda el gráfico generado en un archivo.
+        render: Dibuja y guarda un gráfico en la figura reutilizable (modo headless).
+        render_batch: Dibuja y guarda varios gráficos seguidos en la misma figura.
+        year_charts: Gráficos de todos los meses y todas las categorías de un año.
+        render_parallel: Reparte los gráficos entre varios procesos.
+        chart_key: Clave de un gráfico a partir de su resumen, tipo y título.
+        timeseries_chart: Gráfico de los gastos a lo largo de varios años.
     '''
     DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
+    MAX_FIGSIZE = (16, 9)
+    TIMESERIES_FIGSIZE = (12, 4)
+    MAX_POINTS = 800
+    CACHE_FILE = os.path.join('images', '.render_cache.json')
 
-    def __init__(self, manager:FinanceManager):
+    def __init__(self, manager:FinanceManager, headless:bool = False, cache:bool = True):
         self.manager = manager
-        
-    def expenses_graphics(self, df:pd.DataFrame, title:str, graph_type:str = 'bar')-> plt.Figure:
+        self.headless = headless
+        self.cache = cache
+        self._figure = None
+        self._axes = None
+        self._rendered = None
+        # Resúmenes mensuales ya calculados: (año, mes) -> (versión, resumen) #
+        self._summaries = {}
+
+#########################################
+#Caché de imágenes#
+#########################################
+
+    @staticmethod
+    def chart_key(df:pd.DataFrame, title:str, graph_type:str) -> str:
+        '''Clave de un gráfico: hash del resumen (valores, índice y columnas), del tipo y del título.'''
+        digest = hashlib.sha1()
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        digest.update(repr((list(map(str, df.columns)), graph_type, title)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _registry(self) -> dict:
+        '''Ruta de cada imagen -> clave con la que se generó (se lee la primera vez).'''
+        if self._rendered is None:
+            try:
+                with open(self.CACHE_FILE, encoding='utf-8') as f:
+                    self._rendered = json.load(f)
+            except (OSError, ValueError):
+                self._rendered = {}
+        return self._rendered
+
+    def _is_cached(self, path:str, key:str) -> bool:
+        '''Indica si la imagen ya existe y se generó con la misma clave.'''
+        return self.cache and self._registry().get(path) == key and os.path.exists(path)
+
+    def _remember(self, entries:list) -> None:
+        '''Guarda en el registro las claves de las imágenes generadas.'''
+        if not self.cache or not entries:
+            return
+        registry = self._registry()
+        registry.update(entries)
+        os.makedirs(os.path.dirname(self.CACHE_FILE), exist_ok=True)
+        tmp_path = self.CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f)
+        os.replace(tmp_path, self.CACHE_FILE)
+
+    @staticmethod
+    def _image_path(title:str) -> str:
+        '''Ruta por defecto de un gráfico: images/<título>.png.'''
+        return os.path.join('images', os.path.basename(title.replace('/', '-')) + '.png')
+
+#########################################
+#Gráficos#
+#########################################
+
+    def expenses_graphics(self, df:pd.DataFrame, title:str, graph_type:str = 'bar')-> 'Figure':
         '''Genera gráficos de gastos en diferentes formatos (barra, pastel, línea).'''
+        if self.headless:
+            self.render(df, title, graph_type)
+            return self._figure
+        plt, sns = _plotting()
         #Tamaño de la figura#
-        plt.figure(figsize=(len(df.columns)*2, len(df)*2))
+        plt.figure(figsize=self._figsize(df, graph_type))
         #Tema y paleta de colores#
         sns.set_theme(style="whitegrid")
         sns.set_palette("pastel")
+        self._draw(plt.gca(), df, title, graph_type)
+
+        fig = plt.gcf()
+        safe_title = title.replace('/', '-')
+        # Se muestra siempre, pero solo se reescribe la imagen si cambió el contenido #
+        path, key = self._image_path(title), self.chart_key(df, title, graph_type)
+        if not self._is_cached(path, key):
+            self.save_graph(safe_title + '.png')
+            self._remember([(path, key)])
+        plt.tight_layout()
+        plt.show()
+        plt.close(fig)  # Libera memoria si se generan muchas figuras
+        return fig
+
+    def _figsize(self, df:pd.DataFrame, graph_type:str) -> tuple:
+        '''Tamaño de la figura: crece con el resumen pero sin pasar de MAX_FIGSIZE.'''
+        if graph_type == 'timeseries':
+            return self.TIMESERIES_FIGSIZE
+        width, height = self.MAX_FIGSIZE
+        return min(len(df.columns)*2, width), min(len(df)*2, height)
+
+    def _draw(self, ax, df:pd.DataFrame, title:str, graph_type:str) -> None:
+        '''Dibuja el gráfico sobre unos ejes, sin usar el estado global de pyplot.'''
+        _, sns = _plotting()
         #Filtrando por el tipo de grafico#
         if graph_type == 'pie':
-            plt.pie(df['Amount'], labels=df['Category'],autopct=lambda p: '{:.0f}'.format(p * df['Amount'].sum() / 100), startangle=140)
-            plt.title(title)
+            ax.pie(df['Amount'], labels=df['Category'],autopct=lambda p: '{:.0f}'.format(p * df['Amount'].sum() / 100), startangle=140,
+                   colors=sns.color_palette('pastel'))
+            ax.set_title(title)
+        elif graph_type == 'timeseries':
+            #Serie ya agregada y reducida: se dibuja directamente#
+            ax.plot(df['Date'], df['Amount'], color=sns.color_palette('pastel')[0], linewidth=1)
+            ax.set_xlabel("Fecha")
+            ax.set_ylabel("Monto ($)")
+            ax.set_title(title)
         elif graph_type == 'lineplot':
             #Suma los valores de todas las columnas por filas#
-            df['Total'] = df.iloc[:, 1:].sum(axis=1)
+            df = df.assign(Total=df.iloc[:, 1:].sum(axis=1))
             #Asignando los días (columns[0]='Date') como el índice del DF#
             df = df.set_index(df.columns[0])
             #Reindexando para obtener todos los dias y los vacios se rellenan con 0#
             df = df.reindex(range(1,32), fill_value=0)
             #Se resetea el indice para que se convierta a columna#
-            df.reset_index(inplace=True)
+            df = df.reset_index()
             #Renombrando la columna que era el indice(index el cual reseteamos) a Date#
-            df.rename(columns={df.columns[0]:'Date'}, inplace=True)
-            sns.lineplot(data=df, x='Date', y='Total')
-            plt.xticks(range(1,32,1))
-            plt.xlabel("Día")
-            plt.ylabel("Monto ($)")
-            plt.title(title)
+            df = df.rename(columns={df.columns[0]:'Date'})
+            sns.lineplot(data=df, x='Date', y='Total', ax=ax, color=sns.color_palette('pastel')[0])
+            ax.set_xticks(range(1,32,1))
+            ax.set_xlabel("Día")
+            ax.set_ylabel("Monto ($)")
+            ax.set_title(title)
         else:
             df = df.reset_index()
-            sns.barplot(data=df, x=df.columns[1], y='Amount', color='skyblue')
+            sns.barplot(data=df, x=df.columns[1], y='Amount', color='skyblue', ax=ax)
             #Obtenemos el valor maximo del eje Y#
-            max_y = plt.gca().get_ylim()[1]
+            max_y = ax.get_ylim()[1]
             #Forzamos a que los valores en Y tengan una distancia de 200u#
-            plt.yticks(range(0, int(max_y) + 10, int(max_y / 10)))
-            plt.xticks(rotation=0)
-            plt.title(title)
-            plt.xlabel("Fecha")
-            plt.ylabel("Monto ($)")
+            ax.set_yticks(range(0, int(max_y) + 10, max(1, int(max_y / 10))))
+            ax.tick_params(axis='x', labelrotation=0)
+            ax.set_title(title)
+            ax.set_xlabel("Fecha")
+            ax.set_ylabel("Monto ($)")
 
-        fig = plt.gcf()
-        safe_title = title.replace('/', '-')
-        self.save_graph(safe_title + '.png') 
-        plt.tight_layout()
-        plt.show()
-        plt.close(fig)  # Libera memoria si se generan muchas figuras
-        return fig    
+    def _canvas(self) -> tuple:
+        '''Figura y ejes reutilizables del modo headless (se crean la primera vez).'''
+        if self._figure is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self._figure = Figure()
+            FigureCanvasAgg(self._figure)
+            self._axes = self._figure.add_subplot()
+        return self._figure, self._axes
+
+    def render(self, df:pd.DataFrame, title:str, graph_type:str = 'bar', path:str = None) -> str:
+        '''Dibuja un gráfico en la figura reutilizable y lo guarda como PNG.
+        Si no se indica la ruta se guarda en images/ con el título como nombre.
+        Si la imagen ya existe con el mismo contenido se devuelve sin volver a dibujarla.'''
+        path = path or self._image_path(title)
+        key = self.chart_key(df, title, graph_type)
+        if self._is_cached(path, key):
+            return path
+        self._draw_png(df, title, graph_type, path)
+        self._remember([(path, key)])
+        return path
+
+    def _draw_png(self, df:pd.DataFrame, title:str, graph_type:str, path:str) -> None:
+        '''Dibuja un gráfico en la figura reutilizable y lo guarda en path.'''
+        _, sns = _plotting()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # El estilo se aplica solo mientras se dibuja, sin cambiar el tema global #
+        with sns.axes_style('whitegrid'):
+            fig, ax = self._canvas()
+            ax.clear()
+            # clear() no deshace el aspecto fijo que deja un gráfico de pastel #
+            ax.set_aspect('auto')
+            ax.set_frame_on(True)
+            fig.set_size_inches(*self._figsize(df, graph_type))
+            self._draw(ax, df, title, graph_type)
+            fig.tight_layout()
+            fig.savefig(path)
+
+    def render_batch(self, charts) -> List[str]:
+        '''Dibuja y guarda varios gráficos (df, título, tipo[, ruta]) en la misma figura.'''
+        return [self.render(*chart) for chart in charts]
+
+    def year_charts(self, year:int) -> list:
+        '''Gráficos de un año: un pastel por cada mes con gastos y una barra
+        con los gastos mensuales de cada categoría.'''
+        charts = []
+        months = {}
+        for month in range(1, 13):
+            # Solo se recalculan los meses que cambiaron desde la última vez #
+            version = self.manager.period_version(year, month)
+            cached = self._summaries.get((year, month))
+            if cached is not None and cached[0] == version:
+                status, resumen = cached[1]
+            else:
+                status, resumen = self.manager.monthly_expenses(year, month)
+                self._summaries[(year, month)] = (version, (status, resumen))
+            if status != 'ok':
+                continue
+            charts.append((resumen, f'Gastos Mensuales {month}-{year}', 'pie'))
+            months[month] = resumen.set_index('Category')['Amount']
+        if months:
+            # Filas: meses del año, columnas: categorías #
+            table = pd.DataFrame(months).T.reindex(range(1, 13)).fillna(0)
+            for category in table.columns:
+                resumen = pd.DataFrame({'Month': table.index, 'Amount': table[category].to_numpy()})
+                charts.append((resumen, f'Gastos {category} {year}', 'bar'))
+        return charts
+
+    def timeseries_chart(self, start:str = None, end:str = None, level:str = None) -> tuple:
+        '''Gráfico (df, título, 'timeseries') de los gastos entre start y end.
+        El nivel de agregación (D, W o MS) se elige según la cantidad de días.'''
+        daily = self.manager.daily_expenses(start, end)
+        df, level = prepare_timeseries(daily, level, self.MAX_POINTS)
+        if df.empty:
+            return df, 'Gastos por día', 'timeseries'
+        first, last = daily.index.min(), daily.index.max()
+        title = f'Gastos por {LEVELS[level]} {first:%Y-%m}_{last:%Y-%m}'
+        return df, title, 'timeseries'
+
+    def render_parallel(self, charts:list, workers:int = None) -> List[str]:
+        '''Reparte los gráficos entre varios procesos y devuelve las rutas en el mismo orden.'''
+        charts = list(charts)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(charts) <= 1:
+            return self.render_batch(charts)
+        # Solo se reparten los gráficos cuyo contenido cambió #
+        paths, pending = [], []
+        for df, title, graph_type, *path in charts:
+            path = path[0] if path else self._image_path(title)
+            key = self.chart_key(df, title, graph_type)
+            paths.append(path)
+            if not self._is_cached(path, key):
+                pending.append(((df, title, graph_type, path), key))
+        if len(pending) <= workers:
+            # Para pocos gráficos sale más caro arrancar los procesos que dibujarlos aquí #
+            for chart, _ in pending:
+                self._draw_png(*chart)
+        else:
+            # Un bloque contiguo por proceso para que cada uno reutilice su figura #
+            size = -(-len(pending) // workers)
+            blocks = [[chart for chart, _ in pending[i:i + size]] for i in range(0, len(pending), size)]
+            with ProcessPoolExecutor(max_workers=len(blocks)) as pool:
+                list(pool.map(render_charts, blocks))
+        self._remember([(chart[3], key) for chart, key in pending])
+        return paths
 
     def save_graph(self, filename:str) -> None:
         '''Guarda el gráfico generado en un archivo.'''
+        plt, _ = _plotting()
         os.makedirs('images', exist_ok=True)
         filename = os.path.basename(filename)
         ruta_imagen = os.path.join('images', filename)
         plt.savefig(ruta_imagen)
-        print(f"Gráfica guardada como: {ruta_imagen}")
\ No newline at end of file
+        print(f"Gráfica guardada como: {ruta_imagen}")
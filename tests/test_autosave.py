@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import mock
+from gestor.autosave import AutoSaver
+from gestor.core import FinanceManager
+from gestor.transactions import Transactions
+
+
+class FakeManager:
+    """Gestor mínimo que solo cuenta las sincronizaciones y las compactaciones."""
+
+    def __init__(self):
+        self.syncs = 0
+        self.compactions = 0
+
+    def sync_journal(self):
+        self.syncs += 1
+
+    def compact(self):
+        self.compactions += 1
+        return f'data/snapshot_{self.compactions}.arrow'
+
+
+class TestAutoSaver(unittest.TestCase):
+
+    def test_changes_are_coalesced(self):
+        """Verifica que una ráfaga de cambios produce una sola sincronización y ninguna compactación."""
+        manager = FakeManager()
+
+        async def scenario():
+            saver = AutoSaver(manager, delay=0.05)
+            for _ in range(5):
+                saver.notify()
+                await asyncio.sleep(0.01)
+            self.assertEqual(manager.syncs, 0)
+            await asyncio.sleep(0.1)
+            return saver
+
+        saver = asyncio.run(scenario())
+        self.assertEqual(manager.syncs, 1)
+        self.assertEqual(manager.compactions, 0)
+        self.assertFalse(saver.dirty)
+
+    def test_max_delay_and_flush(self):
+        """Verifica que los cambios continuos se sincronizan tras max_delay y que flush compacta lo pendiente."""
+        manager = FakeManager()
+
+        async def scenario():
+            saver = AutoSaver(manager, delay=0.05, max_delay=0.1)
+            for _ in range(15):
+                saver.notify()
+                await asyncio.sleep(0.01)
+            self.assertGreaterEqual(manager.syncs, 1)
+            saver.notify()
+            return saver
+
+        saver = asyncio.run(scenario())
+        self.assertEqual(manager.compactions, 0)
+        self.assertEqual(saver.flush(), 'data/snapshot_1.arrow')
+        self.assertEqual(saver.flush(), 'data/snapshot_1.arrow')
+        self.assertEqual(manager.compactions, 1)
+        self.assertEqual(saver.flush(force=True), 'data/snapshot_2.arrow')
+
+    def test_one_fsync_off_the_loop(self):
+        """Verifica con un diario real que varias altas seguidas se sincronizan con un solo fsync
+        y que ese fsync no corre en el hilo del bucle."""
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = FinanceManager(journal_path=os.path.join(tmp, 'journal.jsonl'))
+            threads = []
+            real_fsync = os.fsync
+
+            def counting_fsync(fd):
+                threads.append(threading.get_ident())
+                real_fsync(fd)
+
+            async def scenario():
+                saver = AutoSaver(manager, delay=0.05)
+                for day in range(1, 6):
+                    manager.add_transaction(Transactions('expense', 10, 'Comida', 'Cena', f'0{day}-06-2024 21:00:00'))
+                    saver.notify()
+                    await asyncio.sleep(0.005)
+                self.assertEqual(threads, [])
+                await asyncio.sleep(0.2)
+                return saver
+
+            with mock.patch('os.fsync', side_effect=counting_fsync):
+                saver = asyncio.run(scenario())
+            self.assertEqual(saver.syncs, 1)
+            self.assertEqual(len(threads), 1)
+            self.assertNotEqual(threads[0], threading.get_ident())
+            self.assertEqual(len(manager.journal.records()), 5)
+            manager.journal.close()
+
+if __name__ == '__main__':
+    unittest.main()
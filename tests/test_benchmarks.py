@@ -0,0 +1,31 @@
+import unittest
+from benchmarks.ledger import generate_ledger
+from benchmarks.run import compare
+from gestor.core import FinanceManager, validate_frame
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_ledger_is_deterministic_and_valid(self):
+        """Verifica que el libro sintético se repite con la misma semilla y pasa la validación."""
+        first = generate_ledger(500, categories=4, years=2, description_length=12, seed=7)
+        second = generate_ledger(500, categories=4, years=2, description_length=12, seed=7)
+        self.assertTrue(first.equals(second))
+        self.assertFalse(first.equals(generate_ledger(500, categories=4, years=2, description_length=12, seed=8)))
+        self.assertEqual(first['Category'].nunique(), 4)
+        self.assertLessEqual(first['Description'].str.len().max(), 12)
+        valid, errors = validate_frame(first, FinanceManager.DATE_FORMAT)
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(valid['Date'].dt.year.unique()), [2023, 2024])
+
+    def test_compare_flags_regressions(self):
+        """Verifica que solo se marcan los empeoramientos por encima de la tolerancia y del ruido."""
+        baseline = {'results': {'1000': {'load_csv': {'seconds': 1.0, 'peak_bytes': 10_000_000},
+                                         'total_balance': {'seconds': 0.0001}}}}
+        current = {'results': {'1000': {'load_csv': {'seconds': 1.1, 'peak_bytes': 20_000_000},
+                                        'total_balance': {'seconds': 0.001},
+                                        'load_excel': {'skipped': 'más de 10 filas'}}}}
+        self.assertEqual(compare(baseline, current, tolerance=0.25),
+                         [('1000', 'load_csv', 'peak_bytes', 10_000_000, 20_000_000)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from gestor.cache import ParseCache
+from gestor.core import FinanceManager
+import pandas as pd
+import os
+import tempfile
+import time
+
+class TestParseCache(unittest.TestCase):
+
+    def test_hit_and_invalidation(self):
+        """Verifica que la entrada se usa mientras el archivo no cambia y se descarta si cambia."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(os.path.join(tmp, '.cache'))
+            path = os.path.join(tmp, 'data.txt')
+            with open(path, 'w') as f:
+                f.write('uno')
+            self.assertIsNone(cache.get(path))
+            cache.put(path, ('resultado', []))
+            self.assertEqual(cache.get(path), ('resultado', []))
+            with open(path, 'w') as f:
+                f.write('dos')
+            self.assertIsNone(cache.get(path))
+            self.assertEqual(os.listdir(cache.directory), [])
+
+    def test_lru_eviction(self):
+        """Verifica que se eliminan las entradas usadas hace más tiempo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(os.path.join(tmp, '.cache'), max_entries=2)
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(tmp, f'data_{i}.txt'))
+                with open(paths[-1], 'w') as f:
+                    f.write(str(i))
+            cache.put(paths[0], 0)
+            cache.put(paths[1], 1)
+            time.sleep(0.01)
+            cache.get(paths[0])
+            cache.put(paths[2], 2)
+            self.assertEqual(cache.get(paths[0]), 0)
+            self.assertIsNone(cache.get(paths[1]))
+            self.assertEqual(cache.get(paths[2]), 2)
+
+    def test_load_excel_uses_cache(self):
+        """Verifica que la segunda carga de un Excel sin cambios no vuelve a leerlo."""
+        df = pd.DataFrame({
+            'Model': ['income', 'expense'],
+            'Amount': [100, 'abc'],
+            'Category': ['Salario', 'Comida'],
+            'Description': ['Pago', 'Cena'],
+            'Date': ['01-06-2024 10:00:00', '02-06-2024 10:00:00']
+        })
+        original_dir = os.getcwd()
+        original_read = pd.read_excel
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                os.makedirs('data')
+                df.to_excel(os.path.join('data', 'data_2024-06-03.xlsx'), index=False)
+                FinanceManager().load_excel()
+                pd.read_excel = None
+                fm = FinanceManager()
+                errors = fm.load_excel()
+            finally:
+                pd.read_excel = original_read
+                os.chdir(original_dir)
+        self.assertEqual(len(fm), 1)
+        self.assertEqual(len(errors), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from gestor.cli import main
+from gestor.core import FinanceManager
+import io
+import json
+import os
+import tempfile
+
+class TestCommands(unittest.TestCase):
+
+    def setUp(self):
+        """Cada prueba trabaja en una carpeta temporal con un gestor vacío."""
+        self.original_dir = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.fm = FinanceManager()
+        self.saves = 0
+        compact = self.fm.compact
+
+        def counting_compact():
+            self.saves += 1
+            return compact()
+        self.fm.compact = counting_compact
+
+    def tearDown(self):
+        os.chdir(self.original_dir)
+        self.tmp.cleanup()
+
+    def run_commands(self, argv):
+        out = io.StringIO()
+        code = main(argv, manager=self.fm, out=out)
+        return code, out.getvalue()
+
+    def test_operations_file_saves_once(self):
+        """Verifica que un archivo de operaciones se ejecuta en un proceso y guarda una sola vez."""
+        with open('ops.txt', 'w', encoding='utf-8') as f:
+            f.write('# altas\n'
+                    'add expense 10 Comida Cena --date "01-06-2024 21:00:00"\n'
+                    'add expense 5 Transporte Bus --date "02-06-2024 08:00:00"\n'
+                    'report monthly --year 2024 --month 6\n'
+                    'search --category comi\n')
+        code, output = self.run_commands(['run', 'ops.txt'])
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(code, 0)
+        self.assertEqual([r['command'] for r in results], ['add', 'add', 'report', 'search'])
+        self.assertEqual({row['Category']: row['Amount'] for row in results[2]['rows']},
+                         {'Comida': 10.0, 'Transporte': 5.0})
+        self.assertEqual(results[3]['rows'][0]['Index'], 0)
+        self.assertEqual(self.saves, 1)
+
+    def test_csv_output_and_errors(self):
+        """Verifica la salida CSV, que una consulta no guarda y que un error da código 1."""
+        code, output = self.run_commands(['report', 'category', '--format', 'csv'])
+        self.assertEqual(code, 0)
+        self.assertEqual(output.splitlines()[0], 'command,status')
+        code, output = self.run_commands(['add', 'expense', '3', 'Comida', '--date', 'ayer'])
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(output)['status'], 'error')
+        self.assertEqual(self.saves, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 from gestor.core import FinanceManager
 from gestor.transactions import Transactions
 import pandas as pd
+import os
+import tempfile
 
 class TestFinanceManager(unittest.TestCase):
 
@@ -15,6 +17,186 @@ class TestFinanceManager(unittest.TestCase):
         self.fm.add_transaction(tx)
         self.assertEqual(len(self.fm.df_transactions), 1)
 
+    def test_load_excel_reports_bad_rows(self):
+        """Verifica que la carga por columnas conserva las filas válidas y registra las inválidas."""
+        df = pd.DataFrame({
+            'Model': ['income', 'expense', 'expense'],
+            'Amount': [100, 'abc', 50],
+            'Category': ['Salario', 'Comida', 'Transporte'],
+            'Description': ['Pago', 'Cena', 'Bus'],
+            'Date': ['01-06-2024 10:00:00', '02-06-2024 10:00:00', '2024-06-03']
+        })
+        original_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                os.makedirs('data')
+                df.to_excel(os.path.join('data', 'data_2024-06-03.xlsx'), index=False)
+                errors = self.fm.load_excel()
+            finally:
+                os.chdir(original_dir)
+        self.assertEqual(len(self.fm.df_transactions), 1)
+        self.assertEqual(self.fm.df_transactions.at[0, 'Amount'], 100.0)
+        self.assertEqual(len(errors), 2)
+        self.assertIn('fila 3', errors['Message'].iloc[0])
+        self.assertIn('fila 4', errors['Message'].iloc[1])
+        self.assertEqual(errors['Row'].tolist(), [3, 4])
+        self.assertEqual(errors['Column'].tolist(), ['Amount', 'Date'])
+        # Los errores son de cada gestor, no compartidos entre instancias #
+        self.assertEqual(len(FinanceManager().errors), 0)
+
+    def test_errors_are_capped_but_counted(self):
+        """Verifica que un archivo con muchos errores guarda solo MAX_ERRORS pero los cuenta todos."""
+        self.fm.errors.max_entries = 10
+        df = pd.DataFrame({
+            'Model': ['expense'] * 500,
+            'Amount': ['x'] * 250 + [1.0] * 250,
+            'Category': ['Comida'] * 500,
+            'Description': [''] * 500,
+            'Date': ['01-06-2024 10:00:00'] * 250 + ['mal'] * 249 + ['01-06-2024 10:00:00']
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'errores.csv')
+            df.to_csv(path, index=False)
+            errors = self.fm.load_csv(path, chunksize=100)
+        self.assertEqual(len(self.fm), 1)
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(len(self.fm.errors), 499)
+        self.assertEqual(self.fm.errors.dropped, 489)
+        self.assertEqual(self.fm.errors.counts['ValueError'], 499)
+
+    def test_arrow_snapshot_round_trip(self):
+        """Verifica que la instantánea Arrow conserva los datos y permite leer solo algunas columnas."""
+        import pyarrow as pa
+        self.fm.add_transaction(Transactions('income', 1000, 'Salario', 'Pago', '01-06-2024 10:00:00'))
+        self.fm.add_transaction(Transactions('expense', 300, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+        original_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                path = self.fm.save_arrow()
+                schema = pa.ipc.open_file(pa.memory_map(path, 'r')).schema
+                partial = FinanceManager.read_arrow(path, columns=['Model', 'Amount'])
+                loaded = FinanceManager()
+                loaded.load_snapshot()
+            finally:
+                os.chdir(original_dir)
+        self.assertTrue(pa.types.is_dictionary(schema.field('Category').type))
+        self.assertTrue(pa.types.is_timestamp(schema.field('Date').type))
+        self.assertEqual(list(partial.columns), ['Model', 'Amount'])
+        self.assertEqual(loaded.total_balance(), 700.0)
+        self.assertEqual(loaded.df_transactions.at[1, 'Date'], pd.Timestamp(2024, 6, 2, 21))
+
+    def test_arrow_resave_keeps_loaded_data(self):
+        """Verifica que guardar sobre la instantánea cargada no altera los datos en uso."""
+        self.fm.add_transaction(Transactions('expense', 300, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+        original_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                self.fm.save_arrow()
+                loaded = FinanceManager()
+                loaded.load_arrow()
+                loaded.add_transaction(Transactions('income', 1000, 'Salario', 'Pago mensual', '03-06-2024 10:00:00'))
+                loaded.save_arrow()
+                listed = loaded.list_transactions()
+            finally:
+                os.chdir(original_dir)
+        self.assertEqual(list(listed['Description']), ['Cena', 'Pago mensual'])
+
+    def test_compact_layout(self):
+        """Verifica que Model y Category son categóricas y que editar admite categorías nuevas."""
+        fm = FinanceManager(compact_descriptions=True)
+        fm.add_transaction(Transactions('expense', 10, 'Comida', 'Pan'))
+        fm.add_transaction(Transactions('expense', 20, 'Transporte', 'Bus'))
+        self.assertTrue(fm.edit_transaction(0, Category='Mascotas'))
+        for column in ['Model', 'Category', 'Description']:
+            self.assertIsInstance(fm.df_transactions[column].dtype, pd.CategoricalDtype)
+        self.assertEqual(fm.df_transactions.at[0, 'Category'], 'Mascotas')
+        report = fm.memory_report()
+        self.assertEqual(report['rows'], 2)
+        self.assertGreater(report['bytes_per_row'], 0)
+
+    def test_flush_keeps_categorical_codes(self):
+        """Verifica que unir filas nuevas no convierte el libro a texto para volver a codificarlo."""
+        self.fm.add_transaction(Transactions('expense', 10, 'Comida', 'Pan', '01-06-2024 10:00:00'))
+        self.fm.flush()
+        layouts = []
+        apply_layout = self.fm._apply_layout
+
+        def spy(df):
+            layouts.append(df.dtypes.to_dict())
+            return apply_layout(df)
+        self.fm._apply_layout = spy
+        self.fm.add_transaction(Transactions('income', 20, 'Salario', 'Pago', '02-06-2024 10:00:00'))
+        df = self.fm.df_transactions
+        # La concatenación ya llega con los tipos del libro: no hay nada que recodificar #
+        self.assertEqual(layouts, [df.dtypes.to_dict()])
+        self.assertIsInstance(df['Category'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['Category']), ['Comida', 'Salario'])
+        self.assertEqual(list(df['Model']), ['expense', 'income'])
+
+    def test_add_transactions_batch(self):
+        """Verifica que el lote acepta tuplas y objetos y mantiene el orden con las altas sueltas."""
+        self.fm.add_transaction(Transactions('income', 1000, 'Salario', 'Pago'))
+        added = self.fm.add_transactions([
+            ('expense', '25.5', 'Comida', 'Cena', '01-06-2024 21:00:00'),
+            Transactions('expense', 10, 'Transporte', 'Bus', '02-06-2024 08:00:00'),
+        ])
+        self.fm.add_transaction(Transactions('expense', 4, 'Comida', 'Café', '03-06-2024 08:00:00'))
+        self.assertEqual(added, 2)
+        self.assertEqual(list(self.fm.df_transactions['Amount']), [1000.0, 25.5, 10.0, 4.0])
+        self.assertEqual(self.fm.total_balance(), 960.5)
+        with self.assertRaises(ValueError):
+            self.fm.add_transactions([('expense', 5, 'Comida', 'Pan', '2024-06-01')])
+
+    def test_csv_streaming_round_trip(self):
+        """Verifica que la exportación e importación por bloques conserva los datos y reporta filas inválidas."""
+        self.fm.add_transaction(Transactions('income', 1000, 'Salario', 'Pago', '01-06-2024 10:00:00'))
+        self.fm.add_transaction(Transactions('expense', 300, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+        self.fm.add_transaction(Transactions('expense', 50, 'Transporte', 'Bus', '03-06-2024 08:00:00'))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.fm.save_csv(os.path.join(tmp, 'data.csv'), chunksize=2)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('expense,abc,Comida,Pan,04-06-2024 08:00:00\n')
+            loaded = FinanceManager()
+            errors = loaded.load_csv(path, chunksize=2)
+            with open(path, encoding='utf-8') as f:
+                self.assertIn('01-06-2024 10:00:00', f.read())
+        self.assertEqual(len(loaded.df_transactions), 3)
+        self.assertEqual(loaded.total_balance(), 650.0)
+        self.assertEqual(loaded.df_transactions.at[2, 'Date'], pd.Timestamp(2024, 6, 3, 8))
+        self.assertIn('fila 5', errors['Message'].iloc[0])
+
+    def test_load_all_merges_files(self):
+        """Verifica que se cargan varios archivos en paralelo sin repetir transacciones."""
+        day1 = pd.DataFrame({
+            'Model': ['income', 'expense', 'expense'],
+            'Amount': [1000, 20, 20],
+            'Category': ['Salario', 'Comida', 'Comida'],
+            'Description': ['Pago', 'Pan', 'Pan'],
+            'Date': ['01-06-2024 10:00:00', '02-06-2024 08:00:00', '02-06-2024 08:00:00']
+        })
+        day2 = pd.concat([day1, pd.DataFrame({
+            'Model': ['expense', 'expense'], 'Amount': [15, 'x'], 'Category': ['Ocio', 'Ocio'],
+            'Description': ['Cine', 'Cine'], 'Date': ['01-06-2024 20:00:00', '03-06-2024 20:00:00']
+        })], ignore_index=True)
+        original_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                os.makedirs('data')
+                day1.to_excel(os.path.join('data', 'data_2024-06-02.xlsx'), index=False)
+                day2.to_csv(os.path.join('data', 'data_2024-06-03.csv'), index=False)
+                errors = self.fm.load_all(workers=2)
+            finally:
+                os.chdir(original_dir)
+        df = self.fm.df_transactions
+        self.assertEqual(len(df), 4)
+        self.assertEqual(list(df['Description']), ['Pago', 'Cine', 'Pan', 'Pan'])
+        self.assertEqual(len(errors), 1)
+        self.assertIn('data_2024-06-03.csv', errors['Message'].iloc[0])
+
 
 #########################################
 #_____________Total_Income______________#
@@ -32,6 +214,28 @@ class TestFinanceManager(unittest.TestCase):
         self.fm.add_transaction(Transactions('expense', 1000, 'Comida', 'Restaurante'))
         self.assertEqual(self.fm.total_balance(), 2000.0)
 
+    def test_running_totals_follow_mutations(self):
+        """Verifica que los totales acumulados coinciden con el recálculo tras editar y eliminar."""
+        self.fm.check_consistency = True
+        self.fm.add_transaction(Transactions('income', 3000, 'Salario', 'Pago'))
+        self.fm.add_transaction(Transactions('expense', 1000, 'Comida', 'Restaurante'))
+        self.fm.edit_transaction(1, Amount=400.0)
+        self.fm.edit_transaction(0, Model='expense')
+        self.assertEqual(self.fm.total_balance(), -3400.0)
+        self.fm.delete_transaction(0)
+        self.assertEqual(self.fm.total_balance(), -400.0)
+        self.assertTrue(self.fm.verify_totals())
+
+    def test_running_totals_detect_inconsistency(self):
+        """Verifica que el modo de comprobación detecta totales desincronizados."""
+        self.fm.add_transaction(Transactions('income', 100, 'Extra', 'Regalo'))
+        self.fm.df_transactions.at[0, 'Amount'] = 50.0
+        self.assertFalse(self.fm.verify_totals())
+        self.fm.check_consistency = True
+        with self.assertRaises(RuntimeError):
+            self.fm.total_balance()
+
+
 #########################################
 #_______________Expenses________________#
 ######################################### 
@@ -67,6 +271,22 @@ class TestFinanceManager(unittest.TestCase):
             self.assertIn('Comida', df['Category'].values)
             self.assertIn('Transporte', df['Category'].values)
 
+    def test_period_reports_follow_edits(self):
+        """Verifica que los resúmenes por periodo se actualizan al editar y eliminar gastos."""
+        self.fm.add_transaction(Transactions('expense', 100, 'Comida', 'Cena', '05-03-2024 20:00:00'))
+        self.fm.add_transaction(Transactions('expense', 40, 'Transporte', 'Bus', '06-03-2024 08:00:00'))
+        self.fm.edit_transaction(1, Date='10-04-2024 08:00:00')
+        status, resumen = self.fm.monthly_expenses('2024', '03')
+        self.assertEqual(status, 'ok')
+        self.assertEqual(list(resumen['Category']), ['Comida'])
+        status, resumen = self.fm.monthly_expenses('2024', '04', daily=True)
+        self.assertEqual(list(resumen['Date']), [10])
+        self.assertEqual(resumen.at[0, 'Transporte'], 40)
+        self.fm.delete_transaction(0)
+        status, resumen = self.fm.anual_expenses('2024')
+        self.assertEqual(resumen.to_dict(), {4: 40.0})
+        self.assertEqual(list(self.fm.expenses_by_category()['Category']), ['Transporte'])
+
     def test_anual_expenses_invalid_year(self):
         """Verifica que lanza un error si el año es inválido."""
         status, df = self.fm.anual_expenses(year="invalido")
@@ -148,5 +368,35 @@ class TestFinanceManager(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertIn(tx1.__dict__, result.to_dict(orient='records'))
 
+    def test_query_results_do_not_alter_ledger(self):
+        """Verifica que modificar el resultado de una consulta no cambia las transacciones guardadas."""
+        self.fm.add_transaction(Transactions('income', 1000, 'Salario', 'Pago', '01-06-2024 10:00:00'))
+        self.fm.add_transaction(Transactions('expense', 200, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+        found = self.fm.search_transactions()
+        found.loc[0, 'Amount'] = 1
+        listed = self.fm.list_transactions('expense')
+        listed.loc[0, 'Amount'] = 1
+        self.assertEqual(list(self.fm.df_transactions['Amount']), [1000, 200])
+        self.assertEqual(list(self.fm.search_transactions(model='EXPENSE').index), [1])
+
+    def test_query_memory_follows_result_size(self):
+        """Verifica que una búsqueda por tipo solo copia las filas encontradas, no el libro completo."""
+        import tracemalloc
+        from benchmarks.ledger import generate_ledger
+        ledger = generate_ledger(5_000, years=2)
+        ledger['Date'] = pd.to_datetime(ledger['Date'], format=FinanceManager.DATE_FORMAT)
+        self.fm._append_frame(ledger)
+        self.fm.flush()
+        ledger_bytes = self.fm.df_transactions.memory_usage(deep=True).sum()
+        tracemalloc.start()
+        try:
+            # Los ingresos son ~10% del libro sintético #
+            found = self.fm.search_transactions(model='income')
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(len(found), 0)
+        self.assertLess(peak, ledger_bytes / 3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import unittest
+import pandas as pd
+from gestor.core import FinanceManager
+from gestor.indexes import DateIndex, TextIndex
+from gestor.transactions import Transactions
+
+
+class TestDateIndex(unittest.TestCase):
+
+    def test_range_after_mutations(self):
+        """Verifica que el índice por fecha sigue a altas desordenadas, bajas y ediciones."""
+        index = DateIndex()
+        index.rebuild(pd.Series(pd.to_datetime(['2024-01-05', '2024-01-01', '2024-01-03'])))
+        index.insert(3, pd.Timestamp('2024-01-02'))
+        self.assertEqual(list(index.range(pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-04'))), [2, 3])
+        index.delete(1)
+        index.update(0, pd.Timestamp('2024-01-02 12:00'))
+        self.assertEqual(list(index.range(end=pd.Timestamp('2024-01-02 23:00'))), [0, 2])
+
+    def test_search_transactions_by_date_range(self):
+        """Verifica que la búsqueda por fechas devuelve las filas del rango con sus índices."""
+        fm = FinanceManager()
+        fm.add_transaction(Transactions('expense', 10, 'Comida', 'Pan', '03-01-2024 10:00:00'))
+        fm.add_transaction(Transactions('income', 90, 'Salario', 'Pago', '01-01-2024 10:00:00'))
+        fm.add_transaction(Transactions('expense', 20, 'Comida', 'Café', '02-01-2024 10:00:00'))
+        result = fm.search_transactions(model='expense',
+                                        start_date='01-01-2024 00:00:00',
+                                        end_date='02-01-2024 23:59:59')
+        self.assertEqual(list(result.index), [2])
+        self.assertTrue(fm.search_transactions(start_date='2024-01-01').empty)
+
+    def test_out_of_range_dates(self):
+        """Verifica que fechas fuera del rango de pandas dejan el rango vacío o abierto."""
+        fm = FinanceManager()
+        fm.add_transaction(Transactions('expense', 10, 'Comida', 'Pan', '03-01-2024 10:00:00'))
+        fm.add_transaction(Transactions('income', 90, 'Salario', 'Pago', '01-01-2024 10:00:00'))
+        self.assertTrue(fm.search_transactions(start_date='01-01-3000 00:00:00').empty)
+        self.assertTrue(fm.search_transactions(end_date='01-01-1000 00:00:00').empty)
+        self.assertEqual(list(fm.search_transactions(end_date='01-01-3000 00:00:00').index), [0, 1])
+        self.assertEqual(list(fm.search_transactions(start_date='01-01-1000 00:00:00').index), [0, 1])
+
+
+class TestTextIndex(unittest.TestCase):
+
+    def test_substring_search_after_mutations(self):
+        """Verifica la búsqueda por subcadena con trigramas y valores cortos tras editar y eliminar."""
+        index = TextIndex()
+        index.rebuild(pd.Series(['Cena con amigos', 'Bus', 'Cena familiar', None]))
+        self.assertEqual(list(index.search('CENA')), [0, 2])
+        index.update(1, 'Cena rápida')
+        self.assertEqual(list(index.search('cena')), [0, 1, 2])
+        index.delete(0)
+        self.assertEqual(list(index.search('ena')), [0, 1])
+        index.insert(3, 'Autobús')
+        self.assertEqual(list(index.search('bú')), [3])
+
+    def test_search_across_words(self):
+        """Verifica subcadenas que cruzan palabras y que las palabras se indexan al buscar."""
+        index = TextIndex()
+        index.rebuild(pd.Series(['Cena con amigos', 'Con cena', 'Cena', '']))
+        self.assertEqual(index._indexed, 0)
+        self.assertEqual(list(index.search('na con am')), [0])
+        self.assertEqual(list(index.search('cena con')), [0])
+        self.assertEqual(list(index.search(' ')), [0, 1])
+        self.assertEqual(list(index.search('')), [0, 1, 2, 3])
+        index.insert(4, 'Cena con vecinos')
+        self.assertEqual(list(index.search('cena con')), [0, 4])
+
+    def test_search_work_follows_matches(self):
+        """Verifica que la búsqueda solo lee las listas de filas de los valores que coinciden,
+        sin recorrer los códigos de todas las filas, con 1.000 o 10.000 filas."""
+
+        class CountingRows(list):
+            reads = 0
+
+            def __getitem__(self, code):
+                CountingRows.reads += 1
+                return super().__getitem__(code)
+
+        for size in (1_000, 10_000):
+            index = TextIndex()
+            index.rebuild(pd.Series([f'Ref {i}' for i in range(size)] + ['Cena especial']))
+            index.delete(0)
+            index.update(size - 2, 'Cena especial')
+            index.search('ref')
+            index._rows = CountingRows(index._rows)
+            index._codes = None
+            CountingRows.reads = 0
+            self.assertEqual(list(index.search('ESPECIAL')), [size - 2, size - 1])
+            self.assertEqual(CountingRows.reads, 1)
+
+    def test_search_transactions_by_text(self):
+        """Verifica que la búsqueda por categoría y descripción usa los índices y respeta el resto de filtros."""
+        fm = FinanceManager()
+        fm.add_transaction(Transactions('expense', 10, 'Comida', 'Pan integral', '01-01-2024 10:00:00'))
+        fm.add_transaction(Transactions('expense', 20, 'Comida rápida', 'Hamburguesa', '02-01-2024 10:00:00'))
+        fm.add_transaction(Transactions('income', 90, 'Salario', 'Pago', '03-01-2024 10:00:00'))
+        fm.edit_transaction(0, Description='Pan')
+        self.assertEqual(list(fm.search_transactions(category='comida').index), [0, 1])
+        self.assertEqual(list(fm.search_transactions(category='comida', description='pan').index), [0])
+        self.assertTrue(fm.search_transactions(description='integral').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
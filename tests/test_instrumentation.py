@@ -0,0 +1,54 @@
+import unittest
+from gestor.core import FinanceManager
+from gestor.instrumentation import Instrumentation, profile
+from gestor.transactions import Transactions
+from gestor.visualizations import Graphs
+import io
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_records_calls_and_restores_methods(self):
+        """Verifica que se registran llamadas y filas y que al desactivar quedan los métodos originales."""
+        original = FinanceManager.__dict__['add_transaction'], FinanceManager.__dict__['read_arrow']
+        instrumentation = Instrumentation(log_interval=None).enable()
+        try:
+            self.assertTrue(instrumentation.enabled)
+            fm = FinanceManager()
+            fm.add_transaction(Transactions('expense', 10, 'Comida', 'Cena', '01-06-2024 21:00:00'))
+            fm.add_transaction(Transactions('expense', 5, 'Bus', '', '02-06-2024 08:00:00'))
+            found = fm.search_transactions(category='comida')
+        finally:
+            instrumentation.disable()
+        self.assertEqual((FinanceManager.__dict__['add_transaction'], FinanceManager.__dict__['read_arrow']),
+                         original)
+
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats['FinanceManager.add_transaction']['calls'], 2)
+        self.assertEqual(stats['FinanceManager.search_transactions']['rows'], len(found))
+        self.assertEqual(sum(stats['FinanceManager.add_transaction']['histogram'].values()), 2)
+        self.assertIn('FinanceManager.add_transaction n=2', instrumentation.log_line())
+
+        # Desactivada no se registra nada #
+        fm.add_transaction(Transactions('expense', 1, 'Bus', '', '03-06-2024 08:00:00'))
+        self.assertEqual(instrumentation.snapshot()['FinanceManager.add_transaction']['calls'], 2)
+
+    def test_profile_writes_report(self):
+        """Verifica que profile escribe el informe de cProfile y el de memoria."""
+        out = io.StringIO()
+        with profile(out=out, limit=5):
+            FinanceManager().add_transaction(Transactions('income', 100, 'Sueldo', '', '01-06-2024 09:00:00'))
+        report = out.getvalue()
+        self.assertIn('function calls', report)
+        self.assertIn('Memoria: actual', report)
+
+    def test_wraps_graphs(self):
+        """Verifica que también se miden los métodos de Graphs."""
+        instrumentation = Instrumentation(log_interval=None).enable()
+        try:
+            Graphs(FinanceManager(), headless=True, cache=False).timeseries_chart()
+        finally:
+            instrumentation.disable()
+        self.assertEqual(instrumentation.snapshot()['Graphs.timeseries_chart']['calls'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
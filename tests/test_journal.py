@@ -0,0 +1,73 @@
+import unittest
+import os
+import tempfile
+from gestor.core import FinanceManager
+from gestor.transactions import Transactions
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        """Trabaja en una carpeta temporal para no tocar data/."""
+        self.original_dir = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.journal_path = os.path.join('data', 'journal.jsonl')
+
+    def tearDown(self):
+        os.chdir(self.original_dir)
+        self.tmp.cleanup()
+
+    def test_recover_replays_journal(self):
+        """Verifica que los cambios del diario se reaplican sin guardar el Excel."""
+        fm = FinanceManager(journal_path=self.journal_path)
+        fm.recover()
+        fm.add_transaction(Transactions('income', 1000, 'Salario', 'Pago', '01-06-2024 10:00:00'))
+        fm.add_transaction(Transactions('expense', 200, 'Comida', 'Cena', '02-06-2024 10:00:00'))
+        fm.add_transactions([('expense', 30, 'Ocio', 'Cine', '02-06-2024 22:00:00')])
+        fm.edit_transaction(1, Amount=250.0)
+        fm.delete_transaction(0)
+        fm.journal.close()
+
+        recovered = FinanceManager(journal_path=self.journal_path)
+        recovered.recover()
+        self.assertEqual(len(recovered.df_transactions), 2)
+        self.assertEqual(recovered.df_transactions.at[0, 'Amount'], 250.0)
+        self.assertEqual(recovered.df_transactions.at[1, 'Category'], 'Ocio')
+        self.assertEqual(recovered.df_transactions.at[0, 'Category'], 'Comida')
+        recovered.journal.close()
+
+    def test_compact_empties_journal(self):
+        """Verifica que al compactar se guarda la instantánea y el diario queda vacío."""
+        fm = FinanceManager(journal_path=self.journal_path)
+        fm.recover()
+        fm.add_transaction(Transactions('expense', 50, 'Transporte', 'Bus', '03-06-2024 10:00:00'))
+        path = fm.compact()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(fm.journal.records(), [])
+        fm.journal.close()
+
+        recovered = FinanceManager(journal_path=self.journal_path)
+        recovered.recover()
+        self.assertEqual(len(recovered.df_transactions), 1)
+        recovered.journal.close()
+
+    def test_edit_that_triggers_compaction_is_kept(self):
+        """Verifica que una edición que hace compactar el diario queda en la instantánea."""
+        fm = FinanceManager(journal_path=self.journal_path)
+        fm.recover()
+        fm.add_transaction(Transactions('expense', 10, 'Comida', 'Cena', '01-06-2024 21:00:00'))
+        # El registro de la edición supera el límite y provoca la compactación #
+        fm.JOURNAL_MAX_BYTES = fm.journal.size()
+        fm.edit_transaction(0, Amount=999.0)
+        self.assertEqual(fm.journal.records(), [])
+        fm.journal.close()
+
+        recovered = FinanceManager(journal_path=self.journal_path)
+        recovered.recover()
+        self.assertEqual(recovered.df_transactions.at[0, 'Amount'], 999.0)
+        recovered.journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
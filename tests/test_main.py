@@ -0,0 +1,61 @@
+import unittest
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import matplotlib
+matplotlib.use('Agg')
+
+GESTOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gestor')
+
+
+class TestMenu(unittest.TestCase):
+
+    def setUp(self):
+        """Importa main (que usa imports del propio directorio) dentro de una carpeta temporal."""
+        self.original_dir = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        sys.path.insert(0, GESTOR_DIR)
+        sys.modules.pop('main', None)
+        self.main = importlib.import_module('main')
+
+    def tearDown(self):
+        sys.modules.pop('main', None)
+        sys.path.remove(GESTOR_DIR)
+        os.chdir(self.original_dir)
+        self.tmp.cleanup()
+
+    def drive(self, answers):
+        """Ejecuta el bucle del menú respondiendo a cada pregunta con la siguiente respuesta."""
+        answers = iter(answers)
+
+        async def scripted_input(prompt=''):
+            return next(answers)
+
+        self.main.ainput = scripted_input
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            asyncio.run(self.main.run())
+        return out.getvalue()
+
+    def test_menu_search_edit_and_chart(self):
+        """Verifica las opciones que leen texto con strip: buscar, editar y gráfico en el tiempo."""
+        output = self.drive([
+            '2', '25', 'Comida', 'Cena', '01-06-2024 21:00:00',
+            '8', ' expense ', ' comida ', '', '', '',
+            '7', '0', ' Amount ', ' 30 ',
+            '5', '5', '', '',
+            '9',
+        ])
+        self.assertIn('Se encontraron 1 transacciones', output)
+        self.assertIn('Transacción actualizada exitosamente', output)
+        self.assertEqual(self.main.manager.df_transactions.at[0, 'Amount'], 30.0)
+        self.assertTrue(os.listdir('images'))
+        self.assertIn('Datos guardados', output)
+
+if __name__ == '__main__':
+    unittest.main()
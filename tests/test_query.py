@@ -0,0 +1,80 @@
+import unittest
+import pandas as pd
+from unittest import mock
+from gestor.core import FinanceManager
+from gestor.storage import SQLiteStorage
+from gestor.transactions import Transactions
+
+
+def fill(fm):
+    fm.add_transaction(Transactions('income', 3000, 'Salario', 'Pago', '01-06-2024 09:00:00'))
+    fm.add_transaction(Transactions('expense', 100, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+    fm.add_transaction(Transactions('expense', 50, 'Transporte', 'Bus', '15-06-2024 08:00:00'))
+    fm.add_transaction(Transactions('expense', 70, 'Comida', 'Almuerzo', '03-07-2024 13:00:00'))
+    fm.add_transaction(Transactions('expense', 30, 'Comida', 'Cena', '01-01-2025 20:00:00'))
+    return fm
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        """Un gestor en memoria y otro en SQLite con las mismas transacciones."""
+        self.managers = [fill(FinanceManager()), fill(FinanceManager(storage=SQLiteStorage(':memory:')))]
+
+    def tearDown(self):
+        self.managers[1].storage.close()
+
+    def test_group_by_month_and_category(self):
+        """Verifica la misma suma agrupada en memoria y en SQLite."""
+        for fm in self.managers:
+            resumen = (fm.query().model('expense').between('2024-06-01', '2024-12-31 23:59:59')
+                       .group_by('month', 'Category').sum())
+            self.assertEqual(list(resumen.columns), ['Month', 'Category', 'Amount'])
+            self.assertEqual(resumen.values.tolist(), [[6, 'Comida', 100.0], [6, 'Transporte', 50.0],
+                                                       [7, 'Comida', 70.0]])
+            self.assertEqual(fm.query().model('expense').category('comi').sum(), 200.0)
+            self.assertEqual(fm.query().model('expense').description('cena').group_by('year').sum()
+                             .values.tolist(), [[2024, 100.0], [2025, 30.0]])
+
+    def test_out_of_range_years_have_no_data(self):
+        """Verifica que un año mal escrito (fuera de las fechas de pandas) no rompe los resúmenes."""
+        for fm in self.managers:
+            for year in ('20224', '3000'):
+                self.assertEqual(fm.monthly_expenses(year, '06')[0], 'no_data')
+                self.assertEqual(fm.anual_expenses(year)[0], 'no_data')
+            self.assertEqual(fm.monthly_expenses('2024', '13')[0], 'invalid_date')
+            self.assertEqual(fm.anual_expenses('2024')[0], 'ok')
+            self.assertEqual(fm.query().model('expense').between('2024-06-01', '3000-01-01').sum(), 250.0)
+            self.assertEqual(fm.query().model('expense').between('3000-01-01', None).sum(), 0.0)
+
+    def test_daily_expenses_with_far_end_date(self):
+        """Verifica que un fin de rango lejano (año 3000) cierra el rango en lugar de fallar."""
+        for fm in self.managers:
+            daily = fm.daily_expenses('2024-06-15', '3000-01-01')
+            self.assertEqual(list(daily), [50.0, 70.0, 30.0])
+            self.assertEqual(list(fm.daily_expenses(end='2024-06-02')), [100.0])
+            self.assertTrue(fm.daily_expenses(end='1000-01-01').empty)
+
+    def test_query_is_immutable(self):
+        """Verifica que cada filtro devuelve una consulta nueva sin alterar la anterior."""
+        fm = self.managers[0]
+        base = fm.query().model('expense')
+        june = base.between('2024-06-01', '2024-06-30 23:59:59')
+        self.assertEqual(len(base.rows()), 4)
+        self.assertEqual(list(june.rows().index), [1, 2])
+        with self.assertRaises(ValueError):
+            base.group_by('semana')
+
+    def test_pushdown_to_cube(self):
+        """Verifica que una suma de gastos por días completos sale del cubo sin leer las filas."""
+        fm = self.managers[0]
+        with mock.patch.object(FinanceManager, 'df_transactions', new_callable=mock.PropertyMock) as rows:
+            total = fm.query().model('expense').between(pd.Timestamp(2024, 6, 1),
+                                                        pd.Timestamp(2024, 7, 1) - pd.Timedelta(1, 'ns')).sum()
+            rows.assert_not_called()
+        self.assertEqual(total, 150.0)
+        # Con horas sueltas el cubo no basta: se usan los índices y las filas #
+        self.assertEqual(fm.query().model('expense').between('2024-06-02 22:00:00', None).sum(), 150.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+from gestor.core import FinanceManager
+from gestor.storage import SQLiteStorage
+from gestor.transactions import Transactions
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        """Usa una base de datos en memoria para cada prueba."""
+        self.fm = FinanceManager(storage=SQLiteStorage(':memory:'))
+        self.fm.add_transaction(Transactions('income', 3000, 'Salario', 'Pago', '01-06-2024 09:00:00'))
+        self.fm.add_transaction(Transactions('expense', 100, 'Comida', 'Cena', '02-06-2024 21:00:00'))
+        self.fm.add_transaction(Transactions('expense', 50, 'Transporte', 'Bus', '15-06-2024 08:00:00'))
+        self.fm.add_transaction(Transactions('expense', 70, 'Comida', 'Almuerzo', '03-07-2024 13:00:00'))
+
+    def tearDown(self):
+        self.fm.storage.close()
+
+    def test_total_balance(self):
+        """Verifica el balance calculado con SQL."""
+        self.assertEqual(len(self.fm), 4)
+        self.assertEqual(self.fm.total_balance(), 2780.0)
+        self.assertTrue(self.fm.df_transactions.empty)
+
+    def test_monthly_expenses(self):
+        """Verifica los gastos mensuales por categoría y por día."""
+        status, resumen = self.fm.monthly_expenses('2024', '06')
+        self.assertEqual(status, 'ok')
+        self.assertEqual(dict(zip(resumen['Category'], resumen['Amount'])),
+                         {'Comida': 100.0, 'Transporte': 50.0})
+        status, resumen = self.fm.monthly_expenses('2024', '06', daily=True)
+        self.assertEqual(list(resumen['Date']), [2, 15])
+        status, _ = self.fm.monthly_expenses('1999', '01')
+        self.assertEqual(status, 'no_data')
+
+    def test_anual_expenses(self):
+        """Verifica los gastos anuales agrupados por mes."""
+        status, resumen = self.fm.anual_expenses('2024')
+        self.assertEqual(status, 'ok')
+        self.assertEqual(resumen.to_dict(), {6: 150.0, 7: 70.0})
+
+    def test_daily_expenses(self):
+        """Verifica la serie diaria de gastos con el fin del rango incluido."""
+        daily = self.fm.daily_expenses('2024-06-02', '2024-06-15')
+        self.assertEqual(list(daily.index.day), [2, 15])
+        self.assertEqual(list(daily), [100.0, 50.0])
+
+    def test_search_transactions(self):
+        """Verifica la búsqueda por categoría y rango de fechas."""
+        result = self.fm.search_transactions(category='comi', start_date='01-07-2024 00:00:00')
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result.index[0], 3)
+        self.assertEqual(result.iloc[0]['Description'], 'Almuerzo')
+
+    def test_search_non_ascii_text(self):
+        """Verifica que eñes y tildes no distinguen mayúsculas, igual que en memoria."""
+        memory = FinanceManager()
+        for fm in (self.fm, memory):
+            fm.add_transaction(Transactions('expense', 20, 'Ñandú', 'ÁREA común', '04-07-2024 10:00:00'))
+            self.assertEqual(list(fm.search_transactions(category='ÑAN').index), [len(fm) - 1])
+            self.assertEqual(list(fm.search_transactions(description='área').index), [len(fm) - 1])
+            self.assertEqual(fm.query().model('expense').category('ñandú').sum(), 20.0)
+
+    def test_delete_and_edit_keep_positions(self):
+        """Verifica que al eliminar se renumeran las posiciones como en el DataFrame."""
+        self.assertTrue(self.fm.delete_transaction(1))
+        self.assertFalse(self.fm.delete_transaction(10))
+        self.assertTrue(self.fm.edit_transaction(1, Amount=55.0))
+        listing = self.fm.list_transactions()
+        self.assertEqual(list(listing['Index']), [0, 1, 2])
+        self.assertEqual(listing.loc[1, 'Amount'], 55.0)
+        self.assertEqual(listing.loc[1, 'Category'], 'Transporte')
+
+    def test_delete_does_not_rewrite_later_rows(self):
+        """Verifica que borrar no cambia los ids de las filas siguientes y que las posiciones
+        se conservan al reabrir la base de datos."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'finanzas.db')
+            storage = SQLiteStorage(path)
+            for day in range(1, 6):
+                storage.insert({'Model': 'expense', 'Amount': float(day), 'Category': 'Comida',
+                                'Description': 'Cena', 'Date': f'2024-06-0{day} 21:00:00'})
+            changes = storage.conn.total_changes
+            self.assertTrue(storage.delete(0))
+            # Un DELETE y la anotación del id borrado, sin UPDATE de las demás filas #
+            self.assertEqual(storage.conn.total_changes - changes, 2)
+            # Borrar la última fila no deja hueco: su id se reutiliza al insertar #
+            self.assertTrue(storage.delete(3))
+            storage.close()
+
+            storage = SQLiteStorage(path)
+            self.assertEqual(list(storage.select().index), [0, 1, 2])
+            self.assertEqual(storage.row(0)['Amount'], 2.0)
+            self.assertTrue(storage.update(2, 'Amount', 40.0))
+            storage.insert({'Model': 'expense', 'Amount': 6.0, 'Category': 'Comida',
+                            'Description': 'Cena', 'Date': '2024-06-06 21:00:00'})
+            self.assertEqual(list(storage.select()['Amount']), [2.0, 3.0, 40.0, 6.0])
+            self.assertEqual(list(storage.select(start=pd.Timestamp(2024, 6, 4)).index), [2, 3])
+            storage.close()
+
+if __name__ == '__main__':
+    unittest.main()
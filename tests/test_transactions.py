@@ -1,5 +1,5 @@
 import unittest
-from gestor.transactions import Transactions
+from gestor.transactions import Transactions, TransactionRecord, parse_date
 from datetime import datetime
 
 class TestTransactions(unittest.TestCase):
@@ -16,5 +16,30 @@ class TestTransactions(unittest.TestCase):
         with self.assertRaises(ValueError):
             Transactions('expense', 50.0, 'Comida', 'Cena', '2024-06-01')
 
+    def test_parse_date_matches_strptime(self):
+        self.assertEqual(parse_date('01-06-2024 10:05:09'), datetime(2024, 6, 1, 10, 5, 9))
+        # Formatos que strptime acepta aunque no tengan el ancho fijo #
+        self.assertEqual(parse_date('1-6-2024 10:05:09'), datetime(2024, 6, 1, 10, 5, 9))
+        for invalid in ['31-02-2024 10:00:00', '01-06-2024 10:00:0x', '2024-06-01']:
+            with self.assertRaises(ValueError):
+                parse_date(invalid)
+
+    def test_transaction_record(self):
+        t = TransactionRecord('expense', 20.0, 'Comida', 'Cena', '02-06-2024 21:00:00')
+        self.assertFalse(hasattr(t, '__dict__'))
+        self.assertEqual(t.to_dict()['Date'], datetime(2024, 6, 2, 21))
+        with self.assertRaises(ValueError):
+            TransactionRecord('expense', 50.0, 'Comida', 'Cena', '2024-06-01')
+
+    def test_transaction_record_from_rows(self):
+        records = TransactionRecord.from_rows([
+            ('income', '100', 'Salario', 'Pago', '01-06-2024 10:00:00'),
+            ('expense', '5.5', 'Comida', 'Pan', '01-06-2024 10:00:00'),
+        ])
+        self.assertEqual([r.Amount for r in records], [100.0, 5.5])
+        self.assertIs(records[0].Date, records[1].Date)
+        with self.assertRaises(ValueError):
+            TransactionRecord.from_rows([('expense', '1', 'Comida', 'Pan', '01/06/2024')])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,7 +1,11 @@
-from gestor.visualizations import Graphs
+from gestor.visualizations import Graphs, prepare_timeseries
 from gestor.core import FinanceManager
+from gestor.transactions import Transactions
 import os
+import subprocess
+import sys
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 
 #En pytests no es necesario crear una clase que herede como en unittest#
@@ -25,4 +29,75 @@ def test_expenses_graphics_creates_figure(tmp_path):
                                                 
 
     # Verifica que el archivo se haya guardado
-    assert os.path.exists(os.path.join(tmp_path, 'images', 'Gastos Test.png'))
\ No newline at end of file
+    assert os.path.exists(os.path.join(tmp_path, 'images', 'Gastos Test.png'))
+
+def test_import_does_not_load_matplotlib():
+    # Importar el paquete no debe cargar matplotlib ni seaborn hasta el primer gráfico
+    code = ("import sys, gestor.core, gestor.visualizations;"
+            "print('matplotlib' in sys.modules or 'seaborn' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == 'False'
+
+
+def test_headless_batch_reuses_figure(tmp_path):
+    # En modo headless todos los gráficos se dibujan en la misma figura, sin pyplot
+    manager = FinanceManager()
+    for month, category in [(1, 'Comida'), (1, 'Transporte'), (2, 'Comida')]:
+        manager.add_transaction(Transactions('expense', 10 * month, category, 'x', f'05-{month:02d}-2024 10:00:00'))
+    graph = Graphs(manager, headless=True)
+    charts = graph.year_charts(2024)
+    # Un pastel por mes con gastos y una barra por categoría
+    assert len(charts) == 4
+
+    open_figures = plt.get_fignums()
+    original_dir = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        paths = graph.render_batch(charts)
+        figure = graph._figure
+        graph.render(*charts[0])
+    finally:
+        os.chdir(original_dir)
+    assert graph._figure is figure
+    assert plt.get_fignums() == open_figures
+    assert all(os.path.exists(os.path.join(tmp_path, path)) for path in paths)
+
+
+def test_render_cache_only_redraws_changed_charts(tmp_path, monkeypatch):
+    # Tras un gasto nuevo solo se vuelven a dibujar los gráficos cuyo resumen cambió
+    manager = FinanceManager()
+    for month, category in [(1, 'Comida'), (1, 'Transporte'), (2, 'Comida')]:
+        manager.add_transaction(Transactions('expense', 10 * month, category, 'x', f'05-{month:02d}-2024 10:00:00'))
+    graph = Graphs(manager, headless=True)
+    monkeypatch.chdir(tmp_path)
+    graph.render_batch(graph.year_charts(2024))
+
+    drawn = []
+    original = graph._draw_png
+    monkeypatch.setattr(graph, '_draw_png', lambda df, title, *args: drawn.append(title) or original(df, title, *args))
+    graph.render_batch(graph.year_charts(2024))
+    assert drawn == []
+
+    version = manager.period_version(2024, 1)
+    manager.add_transaction(Transactions('expense', 5, 'Transporte', 'x', '07-02-2024 10:00:00'))
+    assert manager.period_version(2024, 1) == version
+    graph.render_batch(graph.year_charts(2024))
+    assert sorted(drawn) == ['Gastos Mensuales 2-2024', 'Gastos Transporte 2024']
+
+
+def test_timeseries_picks_level_and_keeps_extremes():
+    # Diez años de gastos diarios: sin nivel se agrupa por semana y con nivel diario
+    # se reduce la serie conservando el mínimo y el máximo
+    dates = pd.date_range('2015-01-01', '2024-12-31', freq='D')
+    daily = pd.Series(np.random.default_rng(0).integers(1, 100, len(dates)).astype(float), index=dates)
+    daily.iloc[1234] = 1000.0
+    df, level = prepare_timeseries(daily, max_points=800)
+    assert level == 'W' and len(df) <= 800
+    df, level = prepare_timeseries(daily, level='D', max_points=800)
+    assert len(df) <= 800
+    assert df['Amount'].max() == 1000.0 and df['Amount'].min() == daily.min()
+
+    graph = Graphs(FinanceManager(), headless=True)
+    wide = pd.DataFrame({'Month': range(1, 101), 'Amount': 1.0})
+    assert graph._figsize(wide, 'bar') == (4, 9)